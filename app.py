@@ -1,12 +1,10 @@
+import importlib
+import sys
+import time
+
 import streamlit as st
-from ui.page_1_overview import render_overview
-from ui.page_2_dataset import render_dataset
-from ui.page_3_architecture import render_architecture
-from ui.page_4_training import render_training
-from ui.page_5_experiments import render_experiments
-from ui.page_6_evaluation import render_evaluation
-from ui.page_7_prediction import render_prediction
-from ui.page_8_future import render_future_scope
+from backend.config import MODEL_WARMUP, NAVIGATION_MODE, INFERENCE_SERVICE_URL, METRICS_PORT
+from ui.trace_ui import render_trace_panel
 
 def load_css():
     st.markdown("""
@@ -159,43 +157,82 @@ st.set_page_config(
 
 load_css()
 
+# Prometheus scrape endpoint for this process (started once, on a side thread)
+if METRICS_PORT:
+    from backend.metrics import start_metrics_server
+    start_metrics_server(METRICS_PORT)
+
+with st.sidebar.expander("⏱️ Startup Timings"):
+    # Read only if the predictor is already imported: importing it here would
+    # pull numpy and PIL into every cold start
+    model_predictor = sys.modules.get("backend.models.model_predictor")
+    startup_report = model_predictor.get_startup_report() if model_predictor else {}
+    if startup_report:
+        for stage, ms in startup_report.items():
+            st.markdown(f"• {stage.replace('_ms', '').replace('_', ' ').title()}: **{ms:.0f} ms**")
+    else:
+        st.caption("Model not loaded yet.")
+
 st.markdown("<h1>🧬 AI-Based Medical Image Analysis System</h1>", unsafe_allow_html=True)
 st.markdown(
     "Explaining the complete ML lifecycle: from problem definition to live prediction."
 )
 
-# Create 8 tabs for the complete journey
-tabs = st.tabs([
-    "📌 Project Overview",
-    "📊 Dataset Insights",
-    "⚙️ Architecture",
-    "🧠 Model Training",
-    "🧪 Experiments & Failures",
-    "📈 Evaluation",
-    "🖼️ Live Prediction",
-    "🚀 Future Scope"
-])
-
-with tabs[0]:
-    render_overview()
-
-with tabs[1]:
-    render_dataset()
-
-with tabs[2]:
-    render_architecture()
-
-with tabs[3]:
-    render_training()
-
-with tabs[4]:
-    render_experiments()
-
-with tabs[5]:
-    render_evaluation()
-
-with tabs[6]:
-    render_prediction()
-
-with tabs[7]:
-    render_future_scope()
+# The 8 pages of the complete journey: (module, render function). A page
+# module (and its pandas / torch / reportlab imports) is only imported the
+# first time that page is shown
+PAGES = {
+    "📌 Project Overview": ("ui.page_1_overview", "render_overview"),
+    "📊 Dataset Insights": ("ui.page_2_dataset", "render_dataset"),
+    "⚙️ Architecture": ("ui.page_3_architecture", "render_architecture"),
+    "🧠 Model Training": ("ui.page_4_training", "render_training"),
+    "🧪 Experiments & Failures": ("ui.page_5_experiments", "render_experiments"),
+    "📈 Evaluation": ("ui.page_6_evaluation", "render_evaluation"),
+    "🖼️ Live Prediction": ("ui.page_7_prediction", "render_prediction"),
+    "🚀 Future Scope": ("ui.page_8_future", "render_future_scope"),
+}
+
+
+def render_page(name):
+    """Import (first time only) and render one page, recording how long it took"""
+    module_name, function_name = PAGES[name]
+    start = time.perf_counter()
+    getattr(importlib.import_module(module_name), function_name)()
+    st.session_state.page_timings[name] = (time.perf_counter() - start) * 1000
+
+
+if "page_timings" not in st.session_state:
+    st.session_state.page_timings = {}
+
+if NAVIGATION_MODE == "lazy":
+    # Only the selected page executes on each rerun
+    active_page = st.radio(
+        "Navigation",
+        list(PAGES),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_page"
+    )
+    render_page(active_page)
+else:
+    # Every tab executes on each rerun
+    tabs = st.tabs(list(PAGES))
+    for tab, name in zip(tabs, PAGES):
+        with tab:
+            render_page(name)
+
+with st.sidebar.expander("⏱️ Page Render Timings"):
+    for name, ms in st.session_state.page_timings.items():
+        st.markdown(f"• {name}: **{ms:.0f} ms**")
+
+render_trace_panel()
+
+# Load + warm up the model once per server process (cached across sessions),
+# after the page has been drawn so the first screen does not wait for torch;
+# with a separate inference service the UI process never loads the model
+if MODEL_WARMUP and not INFERENCE_SERVICE_URL:
+    from backend.models.model_predictor import warmup_model
+    try:
+        warmup_model()
+    except Exception as exc:
+        st.sidebar.warning(f"Model warm-up failed: {exc}")
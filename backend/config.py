@@ -25,3 +25,109 @@ MODEL_PATH = os.path.join(
     "models",
     "best_model.pth"
 )
+
+# Zero-copy flat weights, converted by `python -m backend.models.checkpoint`.
+# Used instead of MODEL_PATH when present.
+MODEL_FLAT_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "models",
+    "best_model.safetensors"
+)
+# The converter verifies the data once; True re-hashes it on every load
+MODEL_VERIFY_CHECKSUM = False
+
+# Exported by `python -m backend.models.onnx_backend`
+ONNX_MODEL_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "models",
+    "best_model.onnx"
+)
+
+# Prediction cache bounds (see backend/models/prediction_cache.py)
+PREDICTION_CACHE_MAX_ENTRIES = 256
+PREDICTION_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Run a dummy batch through the model when the app starts
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "1") == "1"
+WARMUP_BATCH_SIZE = 1
+
+# "lazy": only the selected page runs on rerun; "tabs": all pages in st.tabs
+NAVIGATION_MODE = "lazy"
+
+# CPU inference backend: "eager", "torchscript", "channels_last", "int8"
+# (see backend/models/inference_backends.py) or "onnx" (ONNX Runtime, see
+# backend/models/onnx_backend.py). Grad-CAM always uses eager fp32 torch.
+INFERENCE_BACKEND = "eager"
+
+# Folder of representative images used to calibrate the int8 backend
+QUANT_CALIBRATION_DIR = None
+
+# Standalone inference service (backend/service). When INFERENCE_SERVICE_URL
+# is set the Streamlit UI sends requests there instead of loading the model.
+INFERENCE_SERVICE_URL = os.environ.get("INFERENCE_SERVICE_URL")
+INFERENCE_SERVICE_HOST = "0.0.0.0"
+INFERENCE_SERVICE_PORT = 8502
+INFERENCE_SERVICE_THREADS = 4
+INFERENCE_CLIENT_POOL_SIZE = 8
+INFERENCE_CLIENT_TIMEOUT = 60
+# Largest POST /predict_batch the service accepts (413 above it); the
+# client splits bigger batches into requests of this size
+INFERENCE_SERVICE_MAX_BATCH = 64
+# Largest request body the service reads (413 above it), checked against
+# Content-Length and again while the body streams in
+INFERENCE_SERVICE_MAX_BODY_BYTES = int(
+    os.environ.get("INFERENCE_SERVICE_MAX_BODY_MB", "64")
+) * 1024 * 1024
+
+# Micro-batching of concurrent single-image predictions
+# (see backend/models/batch_scheduler.py)
+MICROBATCH_ENABLED = True
+MICROBATCH_MAX_SIZE = 16
+MICROBATCH_MAX_LATENCY_MS = 5.0
+
+# Multi-process inference (see backend/models/worker_pool.py); 0 disables.
+# WORKER_TORCH_THREADS = None splits the CPU cores evenly across workers.
+WORKER_POOL_SIZE = 0
+WORKER_TORCH_THREADS = None
+
+# CAM explainers (see backend/gradcam/explainers.py): per-method latency
+# budgets, cached results per method, and Score-CAM masked-input chunk size
+EXPLAINER_BUDGETS_MS = {
+    "gradcam": 250,
+    "gradcam++": 300,
+    "scorecam": 5000,
+}
+EXPLAINER_CACHE_SIZE = 32
+SCORECAM_BATCH_SIZE = 64
+
+# Persistent prediction history (see utils/history_store.py)
+HISTORY_DB_PATH = os.environ.get(
+    "HISTORY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "prediction_history.db")
+)
+HISTORY_PAGE_SIZE = 50
+# Each browser session only sees (and exports) its own predictions; "1"
+# shows every session the whole history of this database instead
+HISTORY_SHARED = os.environ.get("HISTORY_SHARED", "0") == "1"
+
+# Measured evaluation (see backend/models/evaluation.py): a labelled folder
+# with one sub-directory per class; reports are cached per checkpoint hash
+EVALUATION_DATA_DIR = os.environ.get("EVALUATION_DATA_DIR")
+EVALUATION_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "evaluation_cache"
+)
+EVALUATION_BATCH_SIZE = 32
+EVALUATION_LATENCY_SAMPLES = 20
+# The page reuses the folder scan while no class folder changed, for at most
+# this long (editing an image in place does not touch its folder's mtime)
+EVALUATION_SCAN_TTL_S = 60
+
+# Pipeline timing spans (see backend/tracing.py); also switchable from the
+# sidebar. Up to TRACE_CHROME_EVENTS spans are kept for Chrome trace export.
+TRACING_ENABLED = os.environ.get("INFERENCE_TRACING", "0") == "1"
+TRACE_CHROME_EVENTS = 10000
+
+# Prometheus scrape endpoint (see backend/metrics.py). The inference service
+# always serves GET /metrics; set METRICS_PORT to also expose the Streamlit
+# process' metrics from a side thread.
+METRICS_PORT = int(os.environ["METRICS_PORT"]) if os.environ.get("METRICS_PORT") else None
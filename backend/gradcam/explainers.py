@@ -0,0 +1,196 @@
+"""
+Pluggable CAM explainers
+
+Every method takes the shared `GradCAM` of a model, a preprocessed batch and
+the target classes, and returns [N, C, h, w] CAMs normalised to 0–1 with the
+logits of its forward pass, so callers need no separate prediction, and
+whether the CAMs are complete. Methods are registered with their own
+per-image latency budget and result cache, so reviewers can trade fidelity
+for speed per request.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import torch
+import torch.nn.functional as F
+
+from backend.config import EXPLAINER_BUDGETS_MS, EXPLAINER_CACHE_SIZE, SCORECAM_BATCH_SIZE
+from backend.gradcam.gradcam import normalize_cams
+
+EXPLAINERS = OrderedDict()
+
+
+class Explainer:
+    """A registered CAM method with its latency budget and LRU cache"""
+
+    def __init__(self, name, label, func, latency_budget_ms, cache_size):
+        self.name = name
+        self.label = label
+        self.func = func
+        self.latency_budget_ms = latency_budget_ms
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def explain(self, gradcam, input_tensor, class_indices=None, cache_key=None):
+        """
+        Args:
+            gradcam (GradCAM): Shared explainer of the model
+            input_tensor (torch.Tensor): [N, 3, H, W] preprocessed batch
+            class_indices (list[int]): Target classes, or None for each
+                image's predicted class
+            cache_key (str): Identity of the input (e.g. its image hash);
+                results are only cached when given, and only if they are
+                complete and within budget
+
+        Returns:
+            tuple: (cams [N, C, h, w], targets [N, C], softmax
+                    probabilities [N, num_classes], info dict)
+        """
+        key = None
+        if cache_key is not None:
+            key = (cache_key, None if class_indices is None else tuple(class_indices))
+            with self._lock:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    self._cache.move_to_end(key)
+                    cams, targets, probs = hit
+                    return cams, targets, probs, self._info(0.0, cached=True)
+
+        start = time.perf_counter()
+        cams, targets, logits, complete = self.func(
+            gradcam, input_tensor, class_indices, self.latency_budget_ms
+        )
+        probs = torch.softmax(logits, dim=1).cpu().numpy()
+        # Budgets are per image, so report the latency per image too
+        latency_ms = (time.perf_counter() - start) * 1000 / input_tensor.shape[0]
+
+        info = self._info(latency_ms, cached=False, complete=complete)
+        # A partial or late result would be served as if it were the full one
+        if key is not None and self.cache_size > 0 and complete and info["within_budget"]:
+            with self._lock:
+                self._cache[key] = (cams, targets, probs)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return cams, targets, probs, info
+
+    def _info(self, latency_ms, cached, complete=True):
+        return {
+            "method": self.name,
+            "latency_ms": latency_ms,
+            "budget_ms": self.latency_budget_ms,
+            "within_budget": latency_ms <= self.latency_budget_ms,
+            "complete": complete,
+            "cached": cached,
+        }
+
+
+def register_explainer(name, label):
+    """Register a CAM function under `name` with its configured budget"""
+    def decorator(func):
+        EXPLAINERS[name] = Explainer(
+            name, label, func,
+            latency_budget_ms=EXPLAINER_BUDGETS_MS[name],
+            cache_size=EXPLAINER_CACHE_SIZE,
+        )
+        return func
+    return decorator
+
+
+def get_explainer(name):
+    try:
+        return EXPLAINERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown explainer '{name}', expected one of {list(EXPLAINERS)}"
+        )
+
+
+# ===============================
+# METHODS
+# ===============================
+@register_explainer("gradcam", "Grad-CAM (fast)")
+def grad_cam(gradcam, input_tensor, class_indices, budget_ms):
+    logits, activations, gradients, targets = gradcam.forward_with_gradients(
+        input_tensor, class_indices
+    )
+    weights = gradients.mean(dim=(3, 4), keepdim=True)                    # [N, C, k, 1, 1]
+    cams = (weights * activations[:, None]).sum(dim=2)
+    return normalize_cams(cams), targets.cpu().numpy(), logits, True
+
+
+@register_explainer("gradcam++", "Grad-CAM++ (sharper, multiple regions)")
+def grad_cam_plus_plus(gradcam, input_tensor, class_indices, budget_ms):
+    logits, activations, gradients, targets = gradcam.forward_with_gradients(
+        input_tensor, class_indices
+    )
+    activations = activations[:, None]                                    # [N, 1, k, h, w]
+
+    # Closed-form alpha of Chattopadhyay et al. for an exponential score
+    grads_2 = gradients.pow(2)
+    grads_3 = grads_2 * gradients
+    sum_activations = activations.sum(dim=(3, 4), keepdim=True)
+    alpha = grads_2 / (2 * grads_2 + sum_activations * grads_3 + 1e-7)
+    alpha = torch.where(gradients != 0, alpha, torch.zeros_like(alpha))
+
+    weights = (alpha * F.relu(gradients)).sum(dim=(3, 4), keepdim=True)  # [N, C, k, 1, 1]
+    cams = (weights * activations).sum(dim=2)
+    return normalize_cams(cams), targets.cpu().numpy(), logits, True
+
+
+@register_explainer("scorecam", "Score-CAM (gradient-free, slowest)")
+def score_cam(gradcam, input_tensor, class_indices, budget_ms):
+    """
+    Weights each activation channel by the target class probability of the
+    input masked with that (upsampled, 0–1 scaled) channel. Masked inputs go
+    through the backbone in chunks of SCORECAM_BATCH_SIZE, most active
+    channels first; when the next chunk would overrun the latency budget the
+    remaining channels keep zero weight, so the result degrades gracefully
+    instead of stalling, and is reported as incomplete. Image n of a batch
+    must finish within n + 1 budgets. The masked passes run outside the
+    capture: `GradCAM` only records the forward pass of the thread holding
+    it, so they cannot disturb a concurrent Grad-CAM.
+    """
+    start = time.perf_counter()
+    logits, activations = gradcam.forward_with_activations(input_tensor)
+
+    if class_indices is None:
+        targets = logits.argmax(dim=1, keepdim=True)
+    else:
+        targets = torch.as_tensor(class_indices).expand(logits.shape[0], -1)
+
+    height, width = input_tensor.shape[-2:]
+    cams, complete = [], True
+    with torch.no_grad():
+        for n in range(input_tensor.shape[0]):
+            channels = activations[n]                                     # [k, h, w]
+            order = channels.mean(dim=(1, 2)).argsort(descending=True)
+            weights = torch.zeros(channels.shape[0], targets.shape[1])
+
+            chunk_ms = 0.0
+            for chunk_start in range(0, len(order), SCORECAM_BATCH_SIZE):
+                # Stop before a chunk that would overrun the budget
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if chunk_start and elapsed_ms + chunk_ms > (n + 1) * budget_ms:
+                    complete = False
+                    break
+
+                chunk_started = time.perf_counter()
+                idx = order[chunk_start:chunk_start + SCORECAM_BATCH_SIZE]
+                masks = F.interpolate(
+                    channels[idx][:, None], size=(height, width),
+                    mode="bilinear", align_corners=False,
+                )
+                low = masks.amin(dim=(2, 3), keepdim=True)
+                high = masks.amax(dim=(2, 3), keepdim=True)
+                masks = (masks - low) / (high - low + 1e-8)
+
+                probs = torch.softmax(gradcam.model(input_tensor[n:n + 1] * masks), dim=1)
+                weights[idx] = probs[:, targets[n]].cpu()
+                chunk_ms = (time.perf_counter() - chunk_started) * 1000
+
+            cams.append(torch.einsum("kc,khw->chw", weights.to(channels), channels))
+
+    return normalize_cams(torch.stack(cams)), targets.cpu().numpy(), logits, complete
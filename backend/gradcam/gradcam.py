@@ -1,58 +1,271 @@
+"""Grad-CAM visualization module"""
+import threading
+import weakref
+from contextlib import contextmanager
+
 import torch
 import torch.nn.functional as F
 import numpy as np
-import cv2
 from PIL import Image
 
+from backend import tracing
+
+
+def _jet_lut():
+    """256-entry RGB jet colormap (blue → cyan → yellow → red)"""
+    x = np.linspace(0.0, 1.0, 256)
+    lut = np.stack(
+        [np.clip(1.5 - np.abs(4 * x - c), 0.0, 1.0) for c in (3, 2, 1)],
+        axis=1,
+    )
+    return np.round(lut * 255).astype(np.uint8)
+
+
+# [256, 3] uint8, indexed by the 0–255 quantised CAM value
+JET_LUT = _jet_lut()
+
+
+def normalize_cams(cam):
+    """
+    Rectify and scale CAMs to 0–1 over their last two (spatial) axes
+
+    Returns:
+        np.ndarray: Same shape as `cam`
+    """
+    cam = F.relu(cam).detach().cpu().numpy()
+    cam -= cam.min(axis=(-2, -1), keepdims=True)
+    cam /= (cam.max(axis=(-2, -1), keepdims=True) + 1e-8)
+
+    return cam
+
+
+def _compute_cam(activations, gradients):
+    """
+    Weight activations by their spatially averaged gradients
+
+    Returns:
+        np.ndarray: [N, h, w] CAMs normalised to 0–1 per image
+    """
+    weights = gradients.mean(dim=(2, 3), keepdim=True)
+    return normalize_cams((weights * activations).sum(dim=1))
+
 
 class GradCAM:
+    """
+    Grad-CAM explainer bound to one model/layer
+
+    A forward hook is attached only while an explanation is being computed
+    and is removed through its handle afterwards, so a long-lived explainer
+    adds no work to ordinary forward passes and never accumulates hooks.
+    The model is shared with the predict path, so other threads may run it
+    meanwhile: the hook only records the forward pass of the thread that
+    holds the capture, and gradients are taken with `torch.autograd.grad`
+    on those activations rather than through a backward hook.
+    """
+
     def __init__(self, model, target_layer):
         self.model = model
         self.target_layer = target_layer
-        self.gradients = None
         self.activations = None
 
-        self._register_hooks()
+        self._handle = None
+        self._lock = threading.Lock()
+
+    def _register_hook(self):
+        owner = threading.get_ident()
 
-    def _register_hooks(self):
         def forward_hook(module, input, output):
-            self.activations = output
+            if threading.get_ident() == owner:
+                self.activations = output
+
+        self._handle = self.target_layer.register_forward_hook(forward_hook)
 
-        def backward_hook(module, grad_in, grad_out):
-            self.gradients = grad_out[0]
+    def _remove_hook(self):
+        self._handle.remove()
+        self._handle = None
 
-        self.target_layer.register_forward_hook(forward_hook)
-        self.target_layer.register_backward_hook(backward_hook)
+    @contextmanager
+    def _capture(self):
+        with self._lock:
+            self._register_hook()
+            try:
+                yield
+            finally:
+                self._remove_hook()
+                self.activations = None
 
     def generate(self, input_tensor, class_idx):
-        self.model.zero_grad()
+        _, activations, gradients, _ = self.forward_with_gradients(input_tensor, [class_idx])
+        return _compute_cam(activations, gradients[:, 0])[0]
+
+    def forward_with_activations(self, input_tensor):
+        """
+        Plain forward pass that also returns the target layer's activations
+
+        Returns:
+            tuple: (logits [N, num_classes], activations [N, k, h, w])
+        """
+        with self._capture(), torch.no_grad():
+            output = self.model(input_tensor)
+            return output, self.activations
+
+    def forward_with_gradients(self, input_tensor, class_indices=None):
+        """
+        One forward pass, then the gradients of each target class score with
+        respect to the target layer. Each class only backpropagates from its
+        scores down to the target layer; the backbone is not re-run.
+
+        Args:
+            input_tensor (torch.Tensor): [N, 3, H, W] preprocessed batch
+            class_indices (list[int]): Target classes, or None for each
+                image's predicted class
+
+        Returns:
+            tuple: (logits [N, num_classes], activations [N, k, h, w],
+                    gradients [N, C, k, h, w], target classes [N, C])
+        """
+        with tracing.span("gradcam_backward"), self._capture(), torch.enable_grad():
+            output = self.model(input_tensor)
+            activations = self.activations
+
+            if class_indices is None:
+                targets = output.argmax(dim=1, keepdim=True)
+            else:
+                targets = torch.as_tensor(
+                    class_indices, device=output.device
+                ).expand(output.shape[0], -1)
 
-        output = self.model(input_tensor)
-        score = output[:, class_idx]
-        score.backward()
+            gradients = []
+            for c in range(targets.shape[1]):
+                # Samples are independent in eval mode, so the summed score
+                # yields each image's own gradient
+                grads, = torch.autograd.grad(
+                    output.gather(1, targets[:, c:c + 1]).sum(),
+                    activations,
+                    retain_graph=c < targets.shape[1] - 1,
+                )
+                gradients.append(grads)
 
-        weights = self.gradients.mean(dim=(2, 3), keepdim=True)
-        cam = (weights * self.activations).sum(dim=1)
-        cam = F.relu(cam)
+            return (
+                output.detach(),
+                activations.detach(),
+                torch.stack(gradients, dim=1),
+                targets,
+            )
 
-        cam = cam[0].detach().cpu().numpy()
-        cam -= cam.min()
-        cam /= (cam.max() + 1e-8)
+    def generate_batch(self, input_tensor, class_indices):
+        """
+        Build CAMs for every image in a batch and every requested class from
+        one forward pass
 
-        return cam
+        Args:
+            input_tensor (torch.Tensor): [N, 3, H, W] preprocessed batch
+            class_indices (list[int]): Target classes
 
+        Returns:
+            np.ndarray: [N, C, h, w] CAMs normalised to 0–1 per image and class
+        """
+        _, activations, gradients, _ = self.forward_with_gradients(
+            input_tensor, class_indices
+        )
+        weights = gradients.mean(dim=(3, 4), keepdim=True)                # [N, C, k, 1, 1]
+        return normalize_cams((weights * activations[:, None]).sum(dim=2))
 
+
+_explainers = weakref.WeakKeyDictionary()
+
+
+def get_gradcam(model):
+    """Return the process-wide explainer for `model`, creating it once"""
+    explainer = _explainers.get(model)
+    if explainer is None:
+        explainer = _explainers.setdefault(model, GradCAM(model, model.backbone.layer4))
+    return explainer
+
+
+def upsample_cams(cams, size):
+    """
+    Bilinearly upsample CAMs in torch
+
+    Args:
+        cams (np.ndarray): [..., h, w] CAMs in 0–1
+        size (tuple): Target (width, height), as PIL's `Image.size`
+
+    Returns:
+        torch.Tensor: [..., height, width] float32
+    """
+    cams = torch.as_tensor(cams, dtype=torch.float32)
+    lead, (h, w) = cams.shape[:-2], cams.shape[-2:]
+    width, height = size
+
+    upsampled = F.interpolate(
+        cams.reshape(-1, 1, h, w),
+        size=(height, width),
+        mode="bilinear",
+        align_corners=False,
+    )
+    return upsampled.reshape(*lead, height, width)
+
+
+@tracing.traced("overlay")
+def overlay_cams(images_pil, cams, alpha=0.4):
+    """
+    Blend CAMs over their images for every image and class at once
+
+    Each image's class CAMs are upsampled together, mapped through the RGB
+    colormap LUT by indexing and blended with the original in one pass.
+
+    Args:
+        images_pil (list[PIL.Image]): N RGB images
+        cams (np.ndarray): [N, C, h, w] CAMs in 0–1
+        alpha (float): Heatmap weight
+
+    Returns:
+        list[list[PIL.Image]]: overlays[n][c]
+    """
+    lut = JET_LUT.astype(np.float32) * alpha
+
+    overlays = []
+    for image_pil, image_cams in zip(images_pil, cams):
+        upsampled = upsample_cams(image_cams, image_pil.size)            # [C, H, W]
+        indices = (upsampled * 255).clamp_(0, 255).to(torch.uint8).numpy()
+
+        blended = lut[indices]                                           # [C, H, W, 3]
+        blended += np.asarray(image_pil, dtype=np.float32) * (1 - alpha)
+        blended += 0.5
+        blended = blended.astype(np.uint8)
+
+        overlays.append([Image.fromarray(overlay) for overlay in blended])
+    return overlays
+
+
+def overlay_cam(image_pil, cam):
+    """Blend a normalised CAM over the original image"""
+    return overlay_cams([image_pil], cam[None, None])[0][0]
+
+
+@tracing.traced("generate_real_gradcam")
 def generate_real_gradcam(model, image_pil, transform, device, class_idx):
-    image_tensor = transform(image_pil).unsqueeze(0).to(device)
+    with tracing.span("transform"):
+        image_tensor = transform(image_pil).unsqueeze(0).to(device)
+
+    cam = get_gradcam(model).generate(image_tensor, class_idx)
+
+    return overlay_cam(image_pil, cam)
+
 
-    gradcam = GradCAM(model, model.backbone.layer4)
-    cam = gradcam.generate(image_tensor, class_idx)
+def generate_gradcam_batch(model, images_pil, transform, device, class_indices):
+    """
+    Grad-CAM overlays for several images and target classes
 
-    cam = cv2.resize(cam, image_pil.size)
-    heatmap = np.uint8(255 * cam)
-    heatmap = cv2.applyColorMap(heatmap, cv2.COLORMAP_JET)
+    Returns:
+        list[list[PIL.Image]]: overlays[n][c] for image n and class_indices[c]
+    """
+    if hasattr(transform, "batch"):
+        image_tensor = transform.batch(images_pil).to(device)
+    else:
+        image_tensor = torch.stack([transform(img) for img in images_pil]).to(device)
 
-    original = np.array(image_pil)
-    overlay = cv2.addWeighted(original, 0.6, heatmap, 0.4, 0)
+    cams = get_gradcam(model).generate_batch(image_tensor, class_indices)
 
-    return Image.fromarray(overlay)
+    return overlay_cams(images_pil, cams)
@@ -0,0 +1,323 @@
+"""
+Prometheus-style metrics for the inference backend
+
+Counters and histograms are sharded per thread: recording only touches the
+calling thread's own dict, so the hot path takes no lock. Shards are summed
+when the registry is scraped. Gauges are either set directly or computed
+by a callback at scrape time (queue depth, cache stats, memory).
+
+    GET /metrics on the inference service (backend/service/server.py), or
+    start_metrics_server(port) for a side thread in the Streamlit process.
+"""
+import bisect
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.confidence_utils import confidence_label
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _Sharded(_Metric):
+    """
+    Per-thread value dicts; the lock is only taken to register a new shard
+    and at scrape time, when shards of finished threads are folded into a
+    retired total (Streamlit starts new script threads over time)
+    """
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards = []           # [(thread, values)]
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._shards_lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    @staticmethod
+    def _copy(shard):
+        # dict() copies in C without running Python code, so the owner
+        # thread adding a key cannot interrupt it mid-iteration
+        return dict(shard)
+
+    def _merge(self, into, shard):
+        raise NotImplementedError
+
+    def _totals(self):
+        """Sum of all shards, label tuple -> value"""
+        with self._shards_lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = live
+            totals = self._copy(self._retired)
+            snapshots = [self._copy(shard) for _, shard in live]
+
+        for shard in snapshots:
+            self._merge(totals, shard)
+        return totals
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, into, shard):
+        for labels, value in shard.items():
+            into[labels] = into.get(labels, 0) + value
+
+    def value(self, *labels):
+        return self._totals().get(labels, 0)
+
+    def collect(self):
+        lines = self._header()
+        for labels, value in sorted(self._totals().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @staticmethod
+    def _copy(shard):
+        # Copy the per-label lists too: their owner thread keeps mutating them.
+        # Snapshot the dict with dict() first: list(items()) allocates a tuple
+        # per entry, which can trigger GC and hand the GIL to the owner while
+        # it adds a label set
+        return {labels: list(state) for labels, state in _Sharded._copy(shard).items()}
+
+    def _merge(self, into, shard):
+        for labels, state in shard.items():
+            total = into.setdefault(labels, [0] * (len(state) - 1) + [0.0])
+            for i, v in enumerate(state):
+                total[i] += v
+
+    def collect(self):
+        lines = self._header()
+        bounds = self.buckets + (float("inf"),)
+        for labels, state in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                le = ("le", _format_value(bound) if bound == float("inf") else repr(float(bound)))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._function = function
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def set_function(self, function):
+        """`function()` returns a number, or a dict label tuple -> number"""
+        self._function = function
+
+    def collect(self):
+        values = dict(self._values)
+        if self._function is not None:
+            try:
+                computed = self._function()
+            except Exception:
+                computed = None
+            if isinstance(computed, dict):
+                values.update(computed)
+            elif computed is not None:
+                values[()] = computed
+
+        lines = self._header()
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ===============================
+# INFERENCE METRICS
+# ===============================
+PREDICTIONS = REGISTRY.register(Counter(
+    "inference_predictions_total", "Predictions served, by predicted class", ["class_name"]
+))
+CONFIDENCE_LEVELS = REGISTRY.register(Counter(
+    "inference_confidence_level_total", "Predictions by confidence level (confidence_label)", ["level"]
+))
+INFERENCE_LATENCY = REGISTRY.register(Histogram(
+    "inference_latency_seconds", "Prediction call latency", ["endpoint"]
+))
+GRADCAM_LATENCY = REGISTRY.register(Histogram(
+    "gradcam_latency_seconds", "CAM explanation latency", ["method"]
+))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "model_load_seconds", "Model startup stage durations", ["stage"]
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "microbatch_queue_depth", "Requests waiting in the micro-batch queue"
+))
+CACHE_EVENTS = REGISTRY.register(Gauge(
+    "prediction_cache", "Prediction cache hits, misses, evictions, entries and bytes", ["stat"]
+))
+MEMORY = REGISTRY.register(Gauge(
+    "process_resident_memory_bytes", "Resident set size of this process"
+))
+
+
+def record_results(results):
+    """Count predictions by class and confidence level"""
+    for result in results:
+        PREDICTIONS.inc(result["prediction"])
+        CONFIDENCE_LEVELS.inc(confidence_label(result["confidence"]))
+
+
+def resident_memory_bytes():
+    """Current RSS from /proc, falling back to the peak from getrusage"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        # No /proc (macOS) or no os.sysconf (Windows)
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+MEMORY.set_function(resident_memory_bytes)
+
+
+# ===============================
+# SIDE-THREAD SCRAPE ENDPOINT
+# ===============================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """
+    Serve GET /metrics from a daemon thread; later calls return the
+    running server (Streamlit re-executes app.py on every rerun)
+
+    Returns:
+        ThreadingHTTPServer: call `shutdown()` to stop it
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
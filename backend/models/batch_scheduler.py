@@ -0,0 +1,140 @@
+"""Dynamic micro-batching of concurrent prediction requests"""
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from backend import tracing
+
+_SHUTDOWN = object()
+
+
+class MicroBatchScheduler:
+    """
+    Queue single-image requests from any thread and serve them with batched
+    forward passes
+
+    A dispatcher thread takes the oldest request, then keeps collecting until
+    `max_batch_size` requests are queued or `max_latency_ms` has passed since
+    that request arrived, runs one `predict_batch_fn` call and resolves each
+    caller's future. Tracing spans of the batch are added to every caller's
+    request, so the micro-batched path keeps its per-request breakdown.
+    """
+
+    def __init__(self, predict_batch_fn, max_batch_size=16, max_latency_ms=5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency_s = max_latency_ms / 1000
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._max_depth = 0
+        self._batches = 0
+        self._items = 0
+        self._waits_ms = deque(maxlen=1000)
+
+        self._thread = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+        self._thread.start()
+
+    # ---------------- PUBLIC API ----------------
+    def submit(self, image):
+        """Queue an image; the returned Future resolves to a `predict_image` dict"""
+        future = Future()
+        self._queue.put((image, future, time.perf_counter(), contextvars.copy_context()))
+
+        depth = self._queue.qsize()
+        if depth > self._max_depth:
+            with self._lock:
+                self._max_depth = max(self._max_depth, depth)
+        return future
+
+    def predict(self, image, timeout=None):
+        return self.submit(image).result(timeout)
+
+    def shutdown(self):
+        self._queue.put(_SHUTDOWN)
+        self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            waits = np.asarray(self._waits_ms) if self._waits_ms else np.zeros(1)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "queue_wait_p50_ms": float(np.percentile(waits, 50)),
+                "queue_wait_p99_ms": float(np.percentile(waits, 99)),
+            }
+
+    # ---------------- DISPATCHER ----------------
+    def _collect(self):
+        first = self._queue.get()
+        if first is _SHUTDOWN:
+            return None
+
+        batch = [first]
+        deadline = first[2] + self.max_latency_s
+        while len(batch) < self.max_batch_size:
+            try:
+                # Once the deadline passes, only take what is already queued
+                remaining = deadline - time.perf_counter()
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is _SHUTDOWN:
+                self._queue.put(_SHUTDOWN)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            # Drop requests whose callers already cancelled
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._waits_ms.extend((started - queued) * 1000 for _, _, queued, _ in batch)
+
+            error = None
+            with tracing.collect_spans() as spans:
+                try:
+                    results = self.predict_batch_fn(
+                        [image for image, _, _, _ in batch], batch_size=len(batch)
+                    )
+                except Exception as exc:
+                    error = exc
+
+            # Before resolving: the caller's request may end once it has the result
+            for _, _, _, context in batch:
+                context.run(tracing.adopt_spans, spans)
+            if error is not None:
+                for _, future, _, _ in batch:
+                    future.set_exception(error)
+                continue
+
+            for (_, future, _, _), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,242 @@
+"""
+Offline batch scoring of an image folder or manifest
+
+    python -m backend.models.batch_scoring /data/archive --output scores.csv
+    python -m backend.models.batch_scoring manifest.txt --output scores.parquet
+
+Images are decoded on a thread pool one batch ahead of the model, scored
+through `predict_chunks` (bypassing the interactive prediction cache) and
+streamed to CSV (appended) or Parquet (one part file per run in a
+directory). Completed files are appended to `<output>.done` after their
+rows are flushed, so an interrupted run resumes where it stopped; a crash
+between the two writes can repeat at most one batch.
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from backend.config import CLASS_NAMES
+from utils.confidence_utils import confidence_label
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+OUTPUT_FIELDS = ["path", "prediction", "confidence", "confidence_level"] + CLASS_NAMES + ["error"]
+
+
+# ===============================
+# INPUT
+# ===============================
+def iter_image_paths(source):
+    """
+    Image paths under a directory (recursive, sorted) or listed in a
+    manifest file (one path per line, relative to the manifest)
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+        return
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as manifest:
+        for line in manifest:
+            path = line.strip()
+            if path and not path.startswith("#"):
+                yield path if os.path.isabs(path) else os.path.join(base, path)
+
+
+def _decode(path):
+    try:
+        with Image.open(path) as img:
+            return img.convert("RGB"), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _batches(paths, batch_size):
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def decoded_batches(paths, batch_size, decode_workers):
+    """Yield (paths, [(image, error)]) with the next batch decoding meanwhile"""
+    with ThreadPoolExecutor(max_workers=decode_workers) as executor:
+        pending = None
+        for batch in _batches(paths, batch_size):
+            futures = [executor.submit(_decode, path) for path in batch]
+            if pending is not None:
+                yield pending[0], [f.result() for f in pending[1]]
+            pending = (batch, futures)
+        if pending is not None:
+            yield pending[0], [f.result() for f in pending[1]]
+
+
+# ===============================
+# OUTPUT
+# ===============================
+class _CsvSink:
+    def __init__(self, path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+        if new:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    """Row group per batch in `<dir>/part-NNNNN.parquet`, one part per run"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+        os.makedirs(path, exist_ok=True)
+        part = len([n for n in os.listdir(path) if n.startswith("part-")])
+        self._pa = pa
+        self._schema = pa.schema(
+            [("path", pa.string()), ("prediction", pa.string()),
+             ("confidence", pa.float64()), ("confidence_level", pa.string())]
+            + [(name, pa.float64()) for name in CLASS_NAMES]
+            + [("error", pa.string())]
+        )
+        self._writer = pq.ParquetWriter(os.path.join(path, f"part-{part:05d}.parquet"), self._schema)
+
+    def write(self, rows):
+        columns = {name: [row.get(name) for row in rows] for name in OUTPUT_FIELDS}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _open_sink(output):
+    if output.endswith(".parquet"):
+        return _ParquetSink(output)
+    return _CsvSink(output)
+
+
+def _load_done(checkpoint_path):
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path) as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def _result_row(path, result, error):
+    row = {"path": path, "error": error}
+    if result is not None:
+        row.update(
+            prediction=result["prediction"],
+            confidence=result["confidence"],
+            confidence_level=confidence_label(result["confidence"]),
+            **result["probabilities"],
+        )
+    return row
+
+
+# ===============================
+# SCORING
+# ===============================
+def score_directory(source, output, batch_size=64, decode_workers=8, log_every=10):
+    """
+    Score every image in `source` (directory or manifest), streaming to `output`
+
+    Args:
+        source (str): Image directory or manifest file
+        output (str): .csv file or .parquet directory
+        batch_size (int): Images per forward pass
+        decode_workers (int): Threads decoding images
+        log_every (int): Print throughput every N batches (0 disables)
+
+    Returns:
+        dict: scored, failed, skipped, seconds, images_per_sec
+    """
+    from backend.models.model_predictor import format_result, predict_chunks
+
+    checkpoint_path = output.rstrip("/") + ".done"
+    done = _load_done(checkpoint_path)
+    paths = (p for p in iter_image_paths(source) if p not in done)
+
+    sink = _open_sink(output)
+    scored = failed = 0
+    start = time.perf_counter()
+
+    try:
+        with open(checkpoint_path, "a") as checkpoint:
+            for n, (batch, decoded) in enumerate(
+                decoded_batches(paths, batch_size, decode_workers), start=1
+            ):
+                ok = [i for i, (img, _) in enumerate(decoded) if img is not None]
+                results = {}
+                if ok:
+                    probs, = predict_chunks([[decoded[i][0] for i in ok]])
+                    results = {i: format_result(row) for i, row in zip(ok, probs)}
+
+                sink.write([
+                    _result_row(path, results.get(i), decoded[i][1])
+                    for i, path in enumerate(batch)
+                ])
+                checkpoint.write("".join(f"{path}\n" for path in batch))
+                checkpoint.flush()
+
+                scored += len(ok)
+                failed += len(batch) - len(ok)
+                if log_every and n % log_every == 0:
+                    rate = scored / (time.perf_counter() - start)
+                    print(f"⏱️ {scored + failed} images ({rate:.1f} images/sec)")
+    finally:
+        sink.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "scored": scored,
+        "failed": failed,
+        "skipped": len(done),
+        "seconds": seconds,
+        "images_per_sec": scored / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score an image folder or manifest")
+    parser.add_argument("source", help="image directory or manifest file (one path per line)")
+    parser.add_argument("--output", "-o", required=True, help="results .csv file or .parquet directory")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--decode-workers", type=int, default=8)
+    parser.add_argument("--log-every", type=int, default=10, help="batches between progress lines")
+    args = parser.parse_args(argv)
+
+    stats = score_directory(
+        args.source, args.output, args.batch_size, args.decode_workers, args.log_every
+    )
+    print(
+        f"✅ Scored {stats['scored']} images ({stats['failed']} failed, "
+        f"{stats['skipped']} already done) in {stats['seconds']:.1f}s "
+        f"– {stats['images_per_sec']:.1f} images/sec"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Memory-mapped, zero-copy checkpoint format for SimpleCNN
+
+Weights are stored safetensors-style: an 8-byte little-endian header length,
+a JSON header describing every tensor, then one flat data buffer. Loading
+maps the file and wraps each tensor around the mapping, so no bytes are
+copied and pages are shared through the OS page cache by every worker.
+
+Convert the training checkpoint once with:
+    python -m backend.models.checkpoint
+
+The header records the SHA-256, size and mtime of the source .pth;
+`load_checkpoint` re-converts a flat file whose source changed (e.g. after
+retraining) instead of serving stale weights. Only the size and mtime are
+compared on load, so starting a process hashes neither file: the converter
+verifies the data checksum once after writing, and MODEL_VERIFY_CHECKSUM
+re-checks it on every load.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import torch
+
+from backend.config import MODEL_PATH, MODEL_FLAT_PATH
+from backend.models.prediction_cache import (
+    checkpoint_sha256,
+    read_flat_metadata as read_metadata,
+    source_matches,
+)
+
+_DTYPES = {
+    torch.float64: "F64",
+    torch.float32: "F32",
+    torch.float16: "F16",
+    torch.bfloat16: "BF16",
+    torch.int64: "I64",
+    torch.int32: "I32",
+    torch.uint8: "U8",
+    torch.bool: "BOOL",
+}
+_TORCH_DTYPES = {name: dtype for dtype, name in _DTYPES.items()}
+
+
+class ChecksumError(ValueError):
+    """The checkpoint data does not match the checksum in its header"""
+
+
+def save_flat(state_dict, path, metadata=None):
+    """
+    Write a state dict as one flat, mmap-friendly buffer with a SHA-256
+
+    Tensors are laid out by descending element size so every tensor starts
+    at an offset aligned to its dtype. The file is written next to `path`
+    and renamed over it, so processes that have the old file mapped keep
+    valid pages.
+
+    Args:
+        state_dict (dict): name -> torch.Tensor
+        path (str): Output file
+        metadata (dict): Extra string entries for the header's __metadata__
+    """
+    names = sorted(
+        state_dict,
+        key=lambda name: (-state_dict[name].element_size(), name),
+    )
+
+    header = {}
+    blobs = []
+    offset = 0
+    digest = hashlib.sha256()
+    for name in names:
+        tensor = state_dict[name].detach().cpu().contiguous()
+        data = tensor.reshape(-1).view(torch.uint8).numpy().tobytes()
+        header[name] = {
+            "dtype": _DTYPES[tensor.dtype],
+            "shape": list(tensor.shape),
+            "data_offsets": [offset, offset + len(data)],
+        }
+        blobs.append(data)
+        digest.update(data)
+        offset += len(data)
+
+    header["__metadata__"] = {**(metadata or {}), "sha256": digest.hexdigest()}
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    header_bytes += b" " * (-len(header_bytes) % 8)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_flat(path, verify=True):
+    """
+    Map a flat checkpoint and return tensors that alias the mapping
+
+    Args:
+        path (str): File written by `save_flat`
+        verify (bool): Check the data against the stored SHA-256
+
+    Returns:
+        dict: name -> torch.Tensor (zero-copy views of the file)
+
+    Raises:
+        ChecksumError: If `verify` is set and the data is corrupt
+    """
+    with open(path, "rb") as f:
+        # Private copy-on-write mapping: pages stay shared until written
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    header_len, = struct.unpack_from("<Q", buffer, 0)
+    header = json.loads(buffer[8:8 + header_len])
+    metadata = header.pop("__metadata__", {})
+    data_start = 8 + header_len
+
+    if verify:
+        actual = hashlib.sha256(memoryview(buffer)[data_start:]).hexdigest()
+        if actual != metadata.get("sha256"):
+            raise ChecksumError(f"Checksum mismatch for {path}")
+
+    state_dict = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        dtype = _TORCH_DTYPES[info["dtype"]]
+        if end == begin:
+            tensor = torch.empty(info["shape"], dtype=dtype)
+        else:
+            tensor = torch.frombuffer(
+                buffer, dtype=dtype, count=(end - begin) // dtype.itemsize,
+                offset=data_start + begin,
+            ).view(info["shape"])
+        state_dict[name] = tensor
+    return state_dict
+
+
+def convert_checkpoint(pth_path=MODEL_PATH, flat_path=MODEL_FLAT_PATH):
+    """
+    Convert a torch `.pth` state dict into the flat format, recording the
+    source's hash and version, and verify the written data once
+    """
+    st = os.stat(pth_path)
+    state_dict = torch.load(pth_path, map_location="cpu", weights_only=True)
+    save_flat(state_dict, flat_path, {
+        # Hash the file itself, not the header of the flat file being replaced
+        "source_sha256": checkpoint_sha256(pth_path, use_recorded=False),
+        "source_size": str(st.st_size),
+        "source_mtime_ns": str(st.st_mtime_ns),
+    })
+    load_flat(flat_path, verify=True)
+    return flat_path
+
+
+def load_checkpoint(flat_path=MODEL_FLAT_PATH, pth_path=MODEL_PATH, verify=False):
+    """
+    Weights of `pth_path`, memory-mapped from its flat conversion
+
+    A flat file converted from another version of `pth_path` (different
+    size or mtime, or an older converter that did not record them) is
+    converted again first. If it cannot be rewritten, the `.pth` is loaded
+    directly.
+
+    Returns:
+        dict: name -> torch.Tensor
+    """
+    if os.path.exists(pth_path):
+        if not source_matches(read_metadata(flat_path), os.stat(pth_path)):
+            print(f"⚠️ {flat_path} is stale for {pth_path}, re-converting")
+            try:
+                convert_checkpoint(pth_path, flat_path)
+            except OSError as exc:
+                print(f"⚠️ Could not rewrite {flat_path} ({exc}), loading {pth_path}")
+                return torch.load(pth_path, map_location="cpu", weights_only=True)
+    return load_flat(flat_path, verify=verify)
+
+
+if __name__ == "__main__":
+    print(f"✅ Converted to {convert_checkpoint()}")
@@ -0,0 +1,367 @@
+"""
+Evaluation of the model on a labelled image folder
+
+    python -m backend.models.evaluation /data/test_set
+
+The folder holds one sub-directory per class, named as in CLASS_NAMES.
+Images are scored in batches through the predictor; the confusion matrix,
+per-class ROC / PR curves, F1 and CPU latency are computed with NumPy and
+written as JSON under EVALUATION_CACHE_DIR, keyed by the SHA-256 of the
+weights the predictor loaded, the inference backend and a fingerprint of
+the folder. The Evaluation page reads that file, so it only recomputes
+when the model, the backend or the data changes.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from backend.config import (
+    CLASS_NAMES,
+    INFERENCE_BACKEND,
+    EVALUATION_DATA_DIR,
+    EVALUATION_CACHE_DIR,
+    EVALUATION_BATCH_SIZE,
+    EVALUATION_LATENCY_SAMPLES,
+    EVALUATION_SCAN_TTL_S,
+)
+
+NORMAL_CLASS = "normal"
+THRESHOLDS = (0.40, 0.50, 0.60, 0.70, 0.80)
+CURVE_POINTS = 101
+
+
+# ===============================
+# CACHE KEYS
+# ===============================
+def checkpoint_hash():
+    """
+    SHA-256 of the checkpoint this process loaded; the one on disk until
+    the model is first loaded. A best_model.pth replaced while the server
+    runs does not relabel results of the weights still in memory.
+    """
+    from backend.models.model_predictor import served_checkpoint
+    return served_checkpoint()
+
+
+def labelled_images(data_dir):
+    """
+    (path, label index) pairs for every image under `data_dir/<class name>/`
+
+    Sub-directories that are not class names are ignored.
+    """
+    from backend.models.batch_scoring import iter_image_paths
+
+    samples = []
+    for label, name in enumerate(CLASS_NAMES):
+        class_dir = os.path.join(data_dir, name)
+        if os.path.isdir(class_dir):
+            samples.extend((path, label) for path in iter_image_paths(class_dir))
+    return samples
+
+
+def dataset_fingerprint(samples):
+    """Hash of the file list with sizes and mtimes"""
+    digest = hashlib.sha256()
+    for path, label in samples:
+        st = os.stat(path)
+        digest.update(f"{path}\0{label}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+_scans = {}
+_scans_lock = threading.Lock()
+
+
+def _folder_mtimes(data_dir):
+    mtimes = []
+    for name in [""] + list(CLASS_NAMES):
+        try:
+            mtimes.append(os.stat(os.path.join(data_dir, name)).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def scan_dataset(data_dir, max_age_s=EVALUATION_SCAN_TTL_S):
+    """
+    Labelled samples of `data_dir` and their fingerprint
+
+    Walking and stat-ing the whole folder is reused while the folder and
+    its class folders keep their mtimes (no image added, removed or
+    renamed directly in them) and the scan is younger than `max_age_s`.
+
+    Returns:
+        tuple: (samples from `labelled_images`, `dataset_fingerprint`)
+    """
+    key = os.path.abspath(data_dir)
+    mtimes = _folder_mtimes(data_dir)
+    with _scans_lock:
+        cached = _scans.get(key)
+    if cached is not None and cached[0] == mtimes and time.monotonic() - cached[1] < max_age_s:
+        return cached[2], cached[3]
+
+    samples = labelled_images(data_dir)
+    fingerprint = dataset_fingerprint(samples)
+    with _scans_lock:
+        _scans[key] = (mtimes, time.monotonic(), samples, fingerprint)
+    return samples, fingerprint
+
+
+def _cache_path(checkpoint, dataset):
+    # int8 and ONNX give slightly different probabilities than eager fp32
+    return os.path.join(
+        EVALUATION_CACHE_DIR, f"{checkpoint[:16]}-{INFERENCE_BACKEND}-{dataset[:16]}.json"
+    )
+
+
+# ===============================
+# METRICS (vectorised)
+# ===============================
+def confusion_matrix(y_true, y_pred, num_classes):
+    """[actual, predicted] counts"""
+    return np.bincount(
+        y_true * num_classes + y_pred, minlength=num_classes * num_classes
+    ).reshape(num_classes, num_classes)
+
+
+def precision_recall_f1(cm):
+    """Per-class precision, recall and F1 from a confusion matrix"""
+    tp = np.diag(cm).astype(float)
+    predicted = cm.sum(axis=0)
+    actual = cm.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, actual, out=np.zeros_like(tp), where=actual > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+    return precision, recall, f1
+
+
+def binary_curves(y_true, scores):
+    """
+    ROC and precision-recall points for a binary problem
+
+    Args:
+        y_true (np.ndarray): 1 for positives, 0 for negatives
+        scores (np.ndarray): Positive-class score per sample
+
+    Returns:
+        dict: fpr, tpr, precision, recall, thresholds, auc, average_precision
+    """
+    order = np.argsort(-scores, kind="stable")
+    scores, y_true = scores[order], y_true[order]
+
+    # Last index of each distinct score = one operating point per threshold
+    distinct = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tps = np.cumsum(y_true)[distinct]
+    fps = (distinct + 1) - tps
+
+    positives, negatives = tps[-1], fps[-1]
+    tpr = np.r_[0.0, tps / positives] if positives else np.zeros(len(tps) + 1)
+    fpr = np.r_[0.0, fps / negatives] if negatives else np.zeros(len(fps) + 1)
+    precision = tps / (tps + fps)
+    recall = tpr[1:]
+
+    return {
+        "fpr": fpr,
+        "tpr": tpr,
+        "precision": precision,
+        "recall": recall,
+        "thresholds": scores[distinct],
+        "auc": float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)) if positives and negatives else None,
+        "average_precision": float(np.sum(np.diff(np.r_[0.0, recall]) * precision)) if positives else None,
+    }
+
+
+def _resample(x, y, grid):
+    """Curve y(x) on a fixed grid (x ascending), for compact storage and plotting"""
+    return np.interp(grid, x, y).round(4).tolist()
+
+
+def compute_metrics(y_true, probs):
+    """
+    All evaluation metrics for integer labels and softmax probabilities
+
+    Returns:
+        dict: JSON-serialisable report (without latency)
+    """
+    num_classes = len(CLASS_NAMES)
+    y_pred = probs.argmax(axis=1)
+    cm = confusion_matrix(y_true, y_pred, num_classes)
+    precision, recall, f1 = precision_recall_f1(cm)
+    grid = np.linspace(0, 1, CURVE_POINTS)
+
+    per_class = []
+    roc, pr = {}, {}
+    for c, name in enumerate(CLASS_NAMES):
+        curves = binary_curves((y_true == c).astype(int), probs[:, c])
+        per_class.append({
+            "class": name,
+            "support": int(cm[c].sum()),
+            "precision": float(precision[c]),
+            "recall": float(recall[c]),
+            "f1": float(f1[c]),
+            "auc": curves["auc"],
+            "average_precision": curves["average_precision"],
+        })
+        if curves["auc"] is not None:
+            roc[name] = _resample(curves["fpr"], curves["tpr"], grid)
+            # Recall is non-decreasing along the curve: interpolate precision over it
+            pr[name] = _resample(curves["recall"], curves["precision"], grid)
+
+    # Disease vs normal: any disease class counts as positive
+    normal = CLASS_NAMES.index(NORMAL_CLASS)
+    disease_true = (y_true != normal).astype(int)
+    disease_score = 1.0 - probs[:, normal]
+    disease_pred = (y_pred != normal).astype(int)
+    binary_cm = confusion_matrix(disease_true, disease_pred, 2)
+    disease = binary_curves(disease_true, disease_score)
+
+    threshold_rows = []
+    for t in THRESHOLDS:
+        flagged = disease_score >= t
+        tp = int(np.sum(flagged & (disease_true == 1)))
+        threshold_rows.append({
+            "threshold": t,
+            "recall": tp / max(int(disease_true.sum()), 1),
+            "precision": tp / max(int(flagged.sum()), 1),
+        })
+
+    return {
+        "samples": int(len(y_true)),
+        "accuracy": float(np.mean(y_pred == y_true)),
+        # Averaged over classes that occur in the labels or the predictions
+        "macro_f1": float(f1[(cm.sum(axis=0) + cm.sum(axis=1)) > 0].mean()),
+        "confusion_matrix": cm.tolist(),
+        "per_class": per_class,
+        "curve_grid": grid.round(4).tolist(),
+        "roc": roc,
+        "pr": pr,
+        "disease_vs_normal": {
+            "confusion_matrix": binary_cm.tolist(),
+            "auc": disease["auc"],
+            "average_precision": disease["average_precision"],
+            "roc": _resample(disease["fpr"], disease["tpr"], grid) if disease["auc"] is not None else None,
+            "pr": _resample(disease["recall"], disease["precision"], grid) if disease["auc"] is not None else None,
+            "thresholds": threshold_rows,
+        },
+    }
+
+
+# ===============================
+# EVALUATION RUN
+# ===============================
+def _measure_latency(images, samples=EVALUATION_LATENCY_SAMPLES):
+    """Single-image CPU latency (ms) of the predictor's forward pass"""
+    from backend.models.model_predictor import predict_probs, get_device
+
+    images = images[:samples]
+    if not images:
+        return None
+
+    predict_probs(images[:1])  # warm-up
+    latencies = []
+    for img in images:
+        start = time.perf_counter()
+        predict_probs([img])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "samples": len(latencies), "device": get_device()}
+
+
+def evaluate_folder(data_dir, batch_size=EVALUATION_BATCH_SIZE, samples=None):
+    """
+    Score every labelled image in `data_dir` and compute the metrics
+
+    Returns:
+        dict: Report from `compute_metrics` plus latency and throughput
+    """
+    from backend.models.batch_scoring import decoded_batches
+    from backend.models.model_predictor import predict_chunks
+
+    samples = samples if samples is not None else labelled_images(data_dir)
+    if not samples:
+        raise ValueError(f"No labelled images under {data_dir} (expected one folder per class)")
+
+    labels = dict(samples)
+    y_true, probs, latency_images = [], [], []
+    start = time.perf_counter()
+
+    for paths, decoded in decoded_batches((p for p, _ in samples), batch_size, 8):
+        ok = [(path, img) for path, (img, _) in zip(paths, decoded) if img is not None]
+        if not ok:
+            continue
+        probs.append(predict_chunks([[img for _, img in ok]])[0])
+        y_true.extend(labels[path] for path, _ in ok)
+        if len(latency_images) < EVALUATION_LATENCY_SAMPLES:
+            latency_images.extend(img for _, img in ok)
+
+    if not probs:
+        raise ValueError(f"None of the {len(samples)} images under {data_dir} could be decoded")
+
+    seconds = time.perf_counter() - start
+    report = compute_metrics(np.array(y_true), np.concatenate(probs))
+    report["latency"] = _measure_latency(latency_images)
+    report["throughput_per_sec"] = len(y_true) / seconds
+    report["skipped"] = len(samples) - len(y_true)
+    return report
+
+
+def load_cached_report(data_dir=EVALUATION_DATA_DIR):
+    """The cached report for the current checkpoint and data, or None"""
+    if not data_dir or not os.path.isdir(data_dir):
+        return None
+    _, dataset = scan_dataset(data_dir)
+    path = _cache_path(checkpoint_hash(), dataset)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def evaluate(data_dir=EVALUATION_DATA_DIR, force=False):
+    """
+    Cached evaluation report: computed only when the checkpoint, backend or
+    labelled folder changed since the last run (or `force`)
+    """
+    # Explicit runs always rescan, which also refreshes the page's scan
+    samples, dataset = scan_dataset(data_dir, max_age_s=0)
+    path = _cache_path(checkpoint_hash(), dataset)
+
+    if not force and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    report = evaluate_folder(data_dir, samples=samples)
+
+    # The model is loaded now: file the report under the weights that produced it
+    checkpoint = checkpoint_hash()
+    path = _cache_path(checkpoint, dataset)
+    report.update(
+        checkpoint_sha256=checkpoint,
+        inference_backend=INFERENCE_BACKEND,
+        data_dir=os.path.abspath(data_dir),
+        evaluated_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+    os.makedirs(EVALUATION_CACHE_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f)
+    os.replace(tmp_path, path)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    report = evaluate(args[0] if args else EVALUATION_DATA_DIR, force="--force" in sys.argv)
+    print(
+        f"✅ Accuracy {report['accuracy']:.2%}, macro F1 {report['macro_f1']:.3f} "
+        f"on {report['samples']} images – {report['latency']['p50_ms']:.1f} ms/image (CPU p50)"
+    )
@@ -0,0 +1,211 @@
+"""
+CPU inference backends built on top of the eager SimpleCNN
+
+Check a backend against eager fp32 on real images before deploying it:
+    python -m backend.models.inference_backends /path/to/images
+"""
+import copy
+import os
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from backend.models.preprocessing import INPUT_SIZE
+
+BACKENDS = ("eager", "torchscript", "channels_last", "int8")
+
+# Largest softmax probability change from eager fp32 each backend may cause
+MAX_PROB_DELTA = {
+    "eager": 0.0,
+    "torchscript": 1e-4,
+    "channels_last": 1e-4,
+    "int8": 0.05,
+}
+
+
+class _ChannelsLast(nn.Module):
+    """Run the wrapped model with NHWC memory layout for mkldnn conv kernels"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model.to(memory_format=torch.channels_last)
+
+    def forward(self, x):
+        return self.model(x.contiguous(memory_format=torch.channels_last))
+
+
+def _example_input(batch_size=1):
+    return torch.zeros(batch_size, 3, INPUT_SIZE, INPUT_SIZE)
+
+
+def _build_torchscript(model):
+    traced = torch.jit.trace(model, _example_input(), check_trace=False)
+    traced = torch.jit.freeze(traced.eval())
+    return torch.jit.optimize_for_inference(traced)
+
+
+def _quantized_engine():
+    engines = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in engines:
+            return engine
+    raise RuntimeError("No quantized engine available in this torch build")
+
+
+def _build_int8(model, calibration_batches):
+    """Post-training static int8 quantization through FX graph mode"""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    engine = _quantized_engine()
+    torch.backends.quantized.engine = engine
+
+    prepared = prepare_fx(
+        copy.deepcopy(model).eval(),
+        get_default_qconfig_mapping(engine),
+        example_inputs=(_example_input(),),
+    )
+    with torch.no_grad():
+        for batch in calibration_batches:
+            prepared(batch)
+
+    return convert_fx(prepared)
+
+
+def build_backend(model, mode, calibration_batches=None):
+    """
+    Wrap an eager fp32 SimpleCNN for the requested inference backend
+
+    Args:
+        model (nn.Module): Eager fp32 model in eval mode (left untouched)
+        mode (str): One of BACKENDS
+        calibration_batches (list[torch.Tensor]): Preprocessed batches used to
+            calibrate int8 activation ranges (required for "int8")
+
+    Returns:
+        nn.Module: Callable taking [N, 3, 224, 224] and returning logits
+    """
+    if mode == "eager":
+        return model
+    if mode == "torchscript":
+        return _build_torchscript(model)
+    if mode == "channels_last":
+        return _ChannelsLast(copy.deepcopy(model)).eval()
+    if mode == "int8":
+        if not calibration_batches:
+            raise ValueError("int8 backend needs calibration_batches")
+        return _build_int8(model, calibration_batches)
+    raise ValueError(f"Unknown inference backend '{mode}', expected one of {BACKENDS}")
+
+
+def load_calibration_batches(preprocessor, folder, batch_size=8, limit=64):
+    """Preprocessed batches from up to `limit` images in `folder`"""
+    from PIL import Image
+
+    names = sorted(
+        name for name in os.listdir(folder)
+        if name.lower().endswith((".png", ".jpg", ".jpeg"))
+    )[:limit]
+    if not names:
+        raise ValueError(f"No calibration images found in {folder}")
+
+    batches = []
+    for start in range(0, len(names), batch_size):
+        images = [
+            Image.open(os.path.join(folder, name)).convert("RGB")
+            for name in names[start:start + batch_size]
+        ]
+        batches.append(preprocessor.batch(images))
+    return batches
+
+
+def _median_latency_ms(model, inputs, repeats):
+    with torch.no_grad():
+        model(inputs)  # warm-up
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(inputs)
+            times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def compare_backends(model, inputs, modes=BACKENDS, calibration_batches=None, repeats=10):
+    """
+    Accuracy delta and latency of each backend against eager fp32
+
+    Args:
+        model (nn.Module): Eager fp32 reference model
+        inputs (torch.Tensor): [N, 3, 224, 224] evaluation batch
+        modes (tuple[str]): Backends to compare
+        calibration_batches (list[torch.Tensor]): Needed for "int8"
+        repeats (int): Timed forward passes per backend
+
+    Returns:
+        dict: mode -> {"max_prob_delta", "top1_agreement",
+            "decisive_top1_agreement", "latency_ms"}; the decisive agreement
+            only counts inputs whose eager top-2 margin exceeds twice the
+            backend's MAX_PROB_DELTA, where a flip is a real error, not a tie
+    """
+    with torch.no_grad():
+        reference = torch.softmax(model(inputs), dim=1)
+    top2 = reference.topk(2, dim=1).values
+    margin = top2[:, 0] - top2[:, 1]
+
+    report = {}
+    for mode in modes:
+        backend = build_backend(model, mode, calibration_batches)
+        with torch.no_grad():
+            probs = torch.softmax(backend(inputs), dim=1)
+
+        agree = probs.argmax(dim=1) == reference.argmax(dim=1)
+        decisive = margin > 2 * MAX_PROB_DELTA.get(mode, 0.0)
+        report[mode] = {
+            "max_prob_delta": float((probs - reference).abs().max()),
+            "top1_agreement": float(agree.float().mean()),
+            "decisive_top1_agreement": float(agree[decisive].float().mean()) if decisive.any() else 1.0,
+            "latency_ms": _median_latency_ms(backend, inputs, repeats),
+        }
+    return report
+
+
+def backend_failures(report):
+    """
+    Backends of a `compare_backends` report outside their tolerance
+
+    Returns:
+        list[str]: One message per failing backend (empty when all pass)
+    """
+    failures = []
+    for mode, result in report.items():
+        tolerance = MAX_PROB_DELTA.get(mode, 0.0)
+        if result["max_prob_delta"] > tolerance:
+            failures.append(f"{mode}: probabilities differ by {result['max_prob_delta']:.2g} > {tolerance:g}")
+        if result["decisive_top1_agreement"] < 1.0:
+            failures.append(f"{mode}: top-1 agreement {result['decisive_top1_agreement']:.1%} on decisive inputs")
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+
+    from backend.models.model_predictor import _load_model, _get_transform
+
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m backend.models.inference_backends IMAGE_FOLDER")
+
+    # The folder's images both calibrate int8 and are compared
+    batches = load_calibration_batches(_get_transform(), sys.argv[1])
+    report = compare_backends(_load_model(), torch.cat(batches), calibration_batches=batches)
+    for mode, result in report.items():
+        print(
+            f"{mode:>14}: Δp {result['max_prob_delta']:.2e}  "
+            f"top-1 {result['top1_agreement']:.1%}  {result['latency_ms']:.1f} ms"
+        )
+
+    failures = backend_failures(report)
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
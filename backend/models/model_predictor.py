@@ -1,19 +1,45 @@
 # backend/inference.py
+import functools
+import os
+import sys
+import threading
+import time
+
 from PIL import Image
 import numpy as np
 
-from backend.config import CLASS_NAMES, MODEL_PATH
+from backend.config import (
+    CLASS_NAMES,
+    MODEL_PATH,
+    MODEL_FLAT_PATH,
+    MODEL_VERIFY_CHECKSUM,
+    WARMUP_BATCH_SIZE,
+    INFERENCE_BACKEND,
+    QUANT_CALIBRATION_DIR,
+    MICROBATCH_MAX_SIZE,
+    MICROBATCH_MAX_LATENCY_MS,
+    WORKER_POOL_SIZE,
+    WORKER_TORCH_THREADS,
+)
+from backend import metrics, tracing
+from backend.models.prediction_cache import PredictionCache, checkpoint_identity, image_key
+from backend.models.preprocessing import Preprocessor
 
 # Lazy imports - only load when needed
 torch = None
-transforms = None
 SimpleCNN = None
 
+# Cold-start timings in milliseconds (import, deserialization, first inference)
+_startup_timings = {}
+
+# Identity of the checkpoint this process loaded (see served_checkpoint)
+_loaded_checkpoint = None
+
 def _init_torch():
-    global torch, transforms, SimpleCNN
+    global torch, SimpleCNN
     if torch is None:
+        start = time.perf_counter()
         import torch as torch_lib
-        from torchvision import transforms as transforms_lib
         from backend.models.model_architecture import SimpleCNN as SimpleCNN_lib
 
         torch_lib.set_grad_enabled(False)
@@ -21,73 +47,492 @@ def _init_torch():
         torch_lib.backends.cudnn.benchmark = False
 
         torch = torch_lib
-        transforms = transforms_lib
         SimpleCNN = SimpleCNN_lib
+        _startup_timings["import_ms"] = (time.perf_counter() - start) * 1000
 
-def _get_device():
+def get_device():
     _init_torch()
     return "cpu"   # Streamlit → CPU
 
 # ===============================
 # MODEL CACHING
 # ===============================
-_model = None
+def _process_cached(func):
+    """
+    Run `func` once per server process and reuse its result
 
-def _load_model():
-    global _model
-    if _model is None:
-        _init_torch()
-        device = _get_device()
-        model = SimpleCNN(num_classes=len(CLASS_NAMES)).to(device)
-        model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
-        model.eval()
-        _model = model
-        print(f"✅ Model loaded successfully on {device}")
-    return _model
+    Inside a Streamlit app this is `st.cache_resource`, shared by every
+    session and rerun; elsewhere (CLI, services) a locked module-level memo.
+    """
+    if "streamlit" in sys.modules:
+        import streamlit as st
+        return st.cache_resource(show_spinner=False)(func)
 
-def _get_transform():
-    _init_torch()
-    return transforms.Compose([
-        transforms.Resize((224, 224)),
-        transforms.ToTensor(),
-        transforms.Normalize(
-            mean=[0.485, 0.456, 0.406],
-            std=[0.229, 0.224, 0.225],
-        ),
-    ])
+    lock = threading.Lock()
+    memo = []
 
-# ===============================
-# PREDICTION FUNCTION (SAME AS COLAB)
-# ===============================
-def predict_image(pil_image: Image.Image):
+    @functools.wraps(func)
+    def wrapper():
+        with lock:
+            if not memo:
+                memo.append(func())
+            return memo[0]
+
+    return wrapper
+
+def _load_state_dict():
     """
-    Run inference exactly like Colab single-image prediction
+    Checkpoint weights: memory-mapped from MODEL_FLAT_PATH when it has been
+    converted (zero-copy, re-converted if MODEL_PATH changed since),
+    torch.load of MODEL_PATH otherwise
     """
+    global _loaded_checkpoint
+    _init_torch()
+    _loaded_checkpoint = checkpoint_identity()
+    if os.path.exists(MODEL_FLAT_PATH):
+        from backend.models.checkpoint import load_checkpoint
+        return load_checkpoint(MODEL_FLAT_PATH, MODEL_PATH, verify=MODEL_VERIFY_CHECKSUM)
+    return torch.load(MODEL_PATH, map_location="cpu")
+
+@_process_cached
+def _load_model():
     _init_torch()
-    
+    device = get_device()
+
+    start = time.perf_counter()
+    # Build on the meta device and adopt the loaded tensors as parameters,
+    # so the weights are never materialised twice
+    with torch.device("meta"):
+        model = SimpleCNN(num_classes=len(CLASS_NAMES))
+    model.load_state_dict(_load_state_dict(), assign=True)
+    model.to(device)
+    model.eval()
+    _startup_timings["deserialize_ms"] = (time.perf_counter() - start) * 1000
+
+    print(f"✅ Model loaded successfully on {device}")
+    return model
+
+@_process_cached
+def _load_inference_model():
+    """
+    The model used for plain predictions, built for INFERENCE_BACKEND.
+    Grad-CAM needs hooks and gradients, so it keeps using `_load_model()`.
+    """
     model = _load_model()
-    device = _get_device()
+    if INFERENCE_BACKEND in ("eager", "onnx"):
+        return model
+
+    from backend.models.inference_backends import build_backend
+
+    backend = build_backend(model, INFERENCE_BACKEND, _calibration_batches())
+    print(f"✅ Inference backend: {INFERENCE_BACKEND}")
+    return backend
+
+def _calibration_batches():
+    """int8 calibration batches from QUANT_CALIBRATION_DIR (None for other backends)"""
+    if INFERENCE_BACKEND != "int8":
+        return None
+    if QUANT_CALIBRATION_DIR is None:
+        raise ValueError("INFERENCE_BACKEND = 'int8' needs QUANT_CALIBRATION_DIR")
+
+    from backend.models.inference_backends import load_calibration_batches
+    return load_calibration_batches(_get_transform(), QUANT_CALIBRATION_DIR)
+
+@_process_cached
+def _load_onnx_predictor():
+    """ONNX Runtime predictor, or None to fall back to torch"""
+    global _loaded_checkpoint
+    from backend.models.onnx_backend import load_onnx_predictor
+
+    start = time.perf_counter()
+    predictor = load_onnx_predictor()
+    if predictor is not None:
+        _loaded_checkpoint = predictor.source_sha256
+        _startup_timings["deserialize_ms"] = (time.perf_counter() - start) * 1000
+        print("✅ Inference backend: onnx")
+    return predictor
+
+@_process_cached
+def _get_worker_pool():
+    """
+    Process pool sharing the checkpoint weights, or None when disabled.
+    Workers serve INFERENCE_BACKEND; like the single-process path, "onnx"
+    falls back to eager torch when no usable ONNX export exists.
+    """
+    if WORKER_POOL_SIZE <= 0:
+        return None
+
+    _init_torch()
+    from backend.models.worker_pool import InferencePool
+
+    backend = INFERENCE_BACKEND
+    if backend == "onnx" and _load_onnx_predictor() is None:
+        backend = "eager"
+
+    state_dict = _load_state_dict() if backend != "onnx" else None
+    pool = InferencePool(
+        state_dict, len(CLASS_NAMES), WORKER_POOL_SIZE, WORKER_TORCH_THREADS,
+        backend=backend, calibration_batches=_calibration_batches(),
+    )
+    print(f"✅ Inference worker pool: {WORKER_POOL_SIZE} workers ({backend})")
+    return pool
+
+def get_worker_pool_stats():
+    """Per-worker utilisation of the inference pool (None when disabled)"""
+    pool = _get_worker_pool()
+    return pool.stats() if pool is not None else None
+
+def predict_chunks(chunks):
+    """
+    Probabilities for each chunk of RGB images; chunks run in parallel on
+    the worker pool when WORKER_POOL_SIZE > 0, sequentially otherwise.
+    For the pool, images are resized to 224×224 uint8 here, so workers
+    receive small arrays rather than full-resolution images, and the pool
+    round trip is traced and timed like a local forward pass.
+
+    Unlike `predict_batch` it neither reads nor fills the prediction cache,
+    so offline scoring (evaluation, batch scoring) does not evict the
+    interactive entries.
+    """
+    if WORKER_POOL_SIZE <= 0:
+        return [predict_probs(chunk) for chunk in chunks]
+
+    with tracing.span("load_model"):
+        pool = _get_worker_pool()
     transform = _get_transform()
 
-    # Preprocess
-    image = pil_image.convert("RGB")
-    tensor = transform(image).unsqueeze(0).to(device)  # [1, 3, 224, 224]
+    start = time.perf_counter()
+    with tracing.span("transform"):
+        pixels = [transform.pixels(chunk) for chunk in chunks]
+    with tracing.span("forward"):
+        probs = pool.predict_chunks(pixels)
+
+    _startup_timings.setdefault(
+        "first_inference_ms", (time.perf_counter() - start) * 1000
+    )
+    return probs
+
+def predict_probs(rgb_images):
+    """
+    Softmax probabilities [N, num_classes] as a numpy array. Served by ONNX
+    Runtime when INFERENCE_BACKEND is "onnx" (torch is never imported),
+    by the configured torch backend otherwise. The first call is timed.
+    """
+    transform = _get_transform()
+
+    with tracing.span("load_model"):
+        onnx_predictor = _load_onnx_predictor() if INFERENCE_BACKEND == "onnx" else None
+        if onnx_predictor is None:
+            _init_torch()
+            model = _load_inference_model()
+            device = get_device()
+
+    start = time.perf_counter()
+    if onnx_predictor is not None:
+        with tracing.span("transform"):
+            batch = transform.batch_numpy(rgb_images)
+        with tracing.span("forward"):
+            probs = onnx_predictor.predict_proba(batch)
+    else:
+        with tracing.span("transform"):
+            tensor = transform.batch(rgb_images).to(device)  # [N, 3, 224, 224]
+        with tracing.span("forward"), torch.no_grad():
+            probs = torch.softmax(model(tensor), dim=1).cpu().numpy()
+
+    _startup_timings.setdefault(
+        "first_inference_ms", (time.perf_counter() - start) * 1000
+    )
+    return probs
 
-    # Inference
-    with torch.no_grad():
-        outputs = model(tensor)
-        probs = torch.softmax(outputs, dim=1)
-        conf, pred = torch.max(probs, dim=1)
+@_process_cached
+def warmup_model():
+    """
+    Load the model and push a dummy 224×224 batch through it so the first
+    real request does not pay deserialization and cold-kernel latency
+    """
+    dummy = [Image.new("RGB", (224, 224))] * WARMUP_BATCH_SIZE
+    pool = _get_worker_pool()
+    if pool is not None:
+        pool.warmup(_get_transform().pixels(dummy))
+    else:
+        predict_probs(dummy)
+    return True
+
+def served_checkpoint():
+    """
+    Identity of the weights this process serves, recorded when they were
+    loaded: replacing best_model.pth on disk later does not change it.
+    Before the first load, the identity of the checkpoint that will be.
+    """
+    return _loaded_checkpoint or checkpoint_identity()
 
-    pred_idx = pred.item()
-    confidence = conf.item()
-    probs_np = probs[0].cpu().numpy()
+def get_startup_report():
+    """Startup timings in milliseconds recorded so far in this process"""
+    return dict(_startup_timings)
+
+@functools.lru_cache(maxsize=None)
+def _get_transform():
+    """
+    Cached preprocessor: Resize(224) → ToTensor → Normalize(ImageNet),
+    vectorized and numerically matched to the torchvision pipeline
+    """
+    return Preprocessor()
+
+# ===============================
+# PREDICTION FUNCTION (SAME AS COLAB)
+# ===============================
+def format_result(probs_np):
+    """
+    Build the prediction dict for one row of softmax probabilities
+    """
+    pred_idx = int(probs_np.argmax())
 
     return {
         "prediction": CLASS_NAMES[pred_idx],
-        "confidence": confidence,  # 0–1 (multiply by 100 in UI if needed)
+        "confidence": float(probs_np[pred_idx]),  # 0–1 (multiply by 100 in UI if needed)
         "probabilities": {
             CLASS_NAMES[i]: float(probs_np[i])
             for i in range(len(CLASS_NAMES))
         },
     }
+
+# ===============================
+# PREDICTION CACHE
+# ===============================
+_cache = PredictionCache()
+
+def get_cache_stats():
+    """Hit/miss counters and size of the prediction cache"""
+    return _cache.stats()
+
+def clear_prediction_cache():
+    _cache.clear()
+
+def _observed(endpoint):
+    """Record call latency and the predicted classes / confidence levels"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            metrics.INFERENCE_LATENCY.observe(time.perf_counter() - start, endpoint)
+            metrics.record_results(result if isinstance(result, list) else [result])
+            return result
+        return wrapper
+    return decorator
+
+@_observed("predict_image")
+@tracing.traced("predict_image")
+def predict_image(pil_image: Image.Image):
+    """
+    Run inference exactly like Colab single-image prediction
+    """
+    image = pil_image.convert("RGB")
+
+    # Repeat uploads of the same pixels are served without touching torch
+    with tracing.span("cache_lookup"):
+        key = image_key(image)
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    probs, = predict_chunks([[image]])
+
+    result = format_result(probs[0])
+    _cache.put(key, result)
+    return result
+
+# ===============================
+# BATCHED PREDICTION
+# ===============================
+DEFAULT_BATCH_SIZE = 16
+
+@_observed("predict_batch")
+@tracing.traced("predict_batch")
+def predict_batch(images, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Run inference on several images, stacking them into chunks of
+    `batch_size` so each chunk is a single forward pass
+
+    Args:
+        images (list[PIL.Image]): Input images (any mode/size)
+        batch_size (int): Maximum number of images per forward pass
+
+    Returns:
+        list[dict]: One result per image, same shape as `predict_image`
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    rgb_images = [img.convert("RGB") for img in images]
+    with tracing.span("cache_lookup"):
+        keys = [image_key(img) for img in rgb_images]
+        results = [_cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if not pending:
+        return results
+
+    chunks = [
+        pending[start:start + batch_size]
+        for start in range(0, len(pending), batch_size)
+    ]
+    chunk_probs = predict_chunks(
+        [[rgb_images[i] for i in chunk] for chunk in chunks]
+    )
+
+    for chunk, probs in zip(chunks, chunk_probs):
+        for i, row in zip(chunk, probs):
+            results[i] = format_result(row)
+            _cache.put(keys[i], results[i])
+
+    return results
+
+# ===============================
+# MICRO-BATCHED PREDICTION
+# ===============================
+_scheduler = None
+
+@_process_cached
+def _get_scheduler():
+    global _scheduler
+    from backend.models.batch_scheduler import MicroBatchScheduler
+
+    _scheduler = MicroBatchScheduler(
+        predict_batch,
+        max_batch_size=MICROBATCH_MAX_SIZE,
+        max_latency_ms=MICROBATCH_MAX_LATENCY_MS,
+    )
+    return _scheduler
+
+def submit_prediction(pil_image: Image.Image):
+    """
+    Queue an image for micro-batched inference together with concurrent
+    requests from other sessions
+
+    Returns:
+        concurrent.futures.Future: Resolves to the `predict_image` dict
+    """
+    return _get_scheduler().submit(pil_image)
+
+def get_scheduler_stats():
+    """Queue depth, batch size and queue-wait metrics of the scheduler"""
+    return _get_scheduler().stats()
+
+# Scrape-time gauges; reading them never loads the model or starts the scheduler
+metrics.MODEL_LOAD_SECONDS.set_function(lambda: {
+    (stage.replace("_ms", ""),): ms / 1000 for stage, ms in _startup_timings.items()
+})
+metrics.CACHE_EVENTS.set_function(lambda: {
+    (stat,): value for stat, value in _cache.stats().items() if stat != "hit_rate"
+})
+metrics.QUEUE_DEPTH.set_function(
+    lambda: _scheduler.stats()["queue_depth"] if _scheduler is not None else 0
+)
+
+# ===============================
+# PREDICTION + GRAD-CAM (ONE FORWARD)
+# ===============================
+def predict_and_explain(pil_image: Image.Image):
+    """
+    Predict an image and build the Grad-CAM overlay for the predicted
+    class, sharing a single forward pass between the two. This is the
+    single-image case of `predict_and_explain_batch`, which the live
+    prediction page uses.
+
+    Returns:
+        tuple: (result dict shaped like `predict_image`, PIL.Image overlay)
+    """
+    (result, overlays, _), = predict_and_explain_batch([pil_image])
+    return result, overlays[result["prediction"]]
+
+@tracing.traced("predict_and_explain_batch")
+def predict_and_explain_batch(images, method="gradcam", class_names=None,
+                              batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Predict images and explain them with a registered CAM method (see
+    backend.gradcam.explainers). The predictions come from the explainer's
+    own forward pass, so no separate prediction runs; like Grad-CAM, they
+    use the eager fp32 model whatever INFERENCE_BACKEND is. They are
+    therefore not stored in the prediction cache, whose entries must be
+    what `predict_image` and `predict_batch` would compute.
+
+    Args:
+        images (list[PIL.Image]): Input images
+        method (str): Explainer name, e.g. "gradcam", "gradcam++", "scorecam"
+        class_names (list[str]): Classes to explain, or None for each
+            image's predicted class
+        batch_size (int): Maximum number of images per forward pass
+
+    Returns:
+        list[tuple]: Per image (result dict shaped like `predict_image`,
+            dict class name -> PIL.Image overlay, info dict with method,
+            latency_ms, budget_ms, within_budget, complete, cached)
+    """
+    _init_torch()
+    from backend.gradcam.gradcam import get_gradcam, overlay_cams
+    from backend.gradcam.explainers import get_explainer
+
+    explainer = get_explainer(method)
+    gradcam = get_gradcam(_load_model())
+    device = get_device()
+    transform = _get_transform()
+
+    class_indices = None
+    if class_names is not None:
+        class_indices = [CLASS_NAMES.index(name) for name in class_names]
+
+    rgb_images = [img.convert("RGB") for img in images]
+    keys = [image_key(img) for img in rgb_images]
+
+    outputs = []
+    for start in range(0, len(rgb_images), batch_size):
+        chunk = rgb_images[start:start + batch_size]
+        chunk_keys = keys[start:start + batch_size]
+
+        with tracing.span("transform"):
+            image_tensor = transform.batch(chunk).to(device)
+
+        cams, targets, probs, info = explainer.explain(
+            gradcam, image_tensor, class_indices, cache_key="|".join(chunk_keys)
+        )
+        metrics.GRADCAM_LATENCY.observe(info["latency_ms"] / 1000, method)
+
+        for overlays, image_targets, row in zip(overlay_cams(chunk, cams), targets, probs):
+            result = format_result(row)
+            outputs.append((
+                result,
+                {CLASS_NAMES[int(c)]: overlay for c, overlay in zip(image_targets, overlays)},
+                info,
+            ))
+
+    metrics.record_results([result for result, _, _ in outputs])
+    return outputs
+
+def explain_image(pil_image: Image.Image, method="gradcam", class_names=None):
+    """
+    CAM overlays from a registered explainer (see backend.gradcam.explainers)
+
+    Args:
+        pil_image (PIL.Image): Input image
+        method (str): Explainer name, e.g. "gradcam", "gradcam++", "scorecam"
+        class_names (list[str]): Classes to explain, or None for the
+            predicted class
+
+    Returns:
+        tuple: (dict class name -> PIL.Image overlay, info dict with
+                method, latency_ms, budget_ms, within_budget, complete, cached)
+    """
+    (_, overlays, info), = predict_and_explain_batch([pil_image], method, class_names)
+    return overlays, info
+
+def explain_all_classes(pil_image: Image.Image, method="gradcam"):
+    """
+    CAM overlays for every class in CLASS_NAMES from a single forward pass,
+    so differential diagnoses can be compared side by side
+
+    Returns:
+        dict: class name -> PIL.Image overlay
+    """
+    overlays, _ = explain_image(pil_image, method, class_names=CLASS_NAMES)
+    return overlays
@@ -0,0 +1,123 @@
+"""
+ONNX export of SimpleCNN and ONNX Runtime CPU inference
+
+The export records the SHA-256 of the source .pth in the model's metadata;
+`load_onnx_predictor` re-exports a graph whose source no longer matches.
+"""
+import os
+
+import numpy as np
+
+from backend.config import CLASS_NAMES, MODEL_PATH, ONNX_MODEL_PATH
+from backend.models.prediction_cache import checkpoint_sha256
+from backend.models.preprocessing import INPUT_SIZE
+
+INPUT_NAME = "input"
+OUTPUT_NAME = "logits"
+SOURCE_HASH_KEY = "source_sha256"
+
+
+def export_onnx(model_path=MODEL_PATH, onnx_path=ONNX_MODEL_PATH, opset=17):
+    """
+    Export best_model.pth to an ONNX graph with a dynamic batch axis
+
+    Returns:
+        str: Path of the written .onnx file
+    """
+    import torch
+    from backend.models.model_architecture import SimpleCNN
+
+    model = SimpleCNN(num_classes=len(CLASS_NAMES))
+    model.load_state_dict(torch.load(model_path, map_location="cpu"))
+    model.eval()
+
+    dummy = torch.zeros(1, 3, INPUT_SIZE, INPUT_SIZE)
+    torch.onnx.export(
+        model,
+        dummy,
+        onnx_path,
+        input_names=[INPUT_NAME],
+        output_names=[OUTPUT_NAME],
+        dynamic_axes={INPUT_NAME: {0: "batch"}, OUTPUT_NAME: {0: "batch"}},
+        opset_version=opset,
+    )
+    _set_source_hash(onnx_path, checkpoint_sha256(model_path))
+    return onnx_path
+
+
+def _set_source_hash(onnx_path, source_sha256):
+    import onnx
+
+    # External weight files (best_model.onnx.data) are left untouched
+    model = onnx.load(onnx_path, load_external_data=False)
+    for prop in list(model.metadata_props):
+        if prop.key == SOURCE_HASH_KEY:
+            model.metadata_props.remove(prop)
+    model.metadata_props.add(key=SOURCE_HASH_KEY, value=source_sha256)
+    onnx.save(model, onnx_path)
+
+
+class OnnxPredictor:
+    """ONNX Runtime session returning softmax probabilities, no torch needed"""
+
+    def __init__(self, onnx_path=ONNX_MODEL_PATH, intra_op_threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+
+    @property
+    def source_sha256(self):
+        """SHA-256 of the .pth the graph was exported from (None if unrecorded)"""
+        return self.session.get_modelmeta().custom_metadata_map.get(SOURCE_HASH_KEY)
+
+    def predict_proba(self, batch):
+        """
+        Args:
+            batch (np.ndarray): [N, 3, 224, 224] float32, normalised
+
+        Returns:
+            np.ndarray: [N, num_classes] softmax probabilities
+        """
+        logits, = self.session.run([OUTPUT_NAME], {INPUT_NAME: batch})
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def load_onnx_predictor(onnx_path=ONNX_MODEL_PATH, model_path=MODEL_PATH):
+    """
+    OnnxPredictor for `onnx_path`, or None when onnxruntime is not installed
+    or the model has not been exported yet (callers fall back to torch)
+
+    A graph exported from a different `model_path` (or before the source
+    hash was recorded) is exported again; if that fails, None is returned
+    rather than serving stale weights.
+    """
+    if not os.path.exists(onnx_path):
+        print(f"⚠️ {onnx_path} not found, falling back to torch")
+        return None
+    try:
+        predictor = OnnxPredictor(onnx_path)
+    except ImportError:
+        print("⚠️ onnxruntime not installed, falling back to torch")
+        return None
+
+    if not os.path.exists(model_path) or predictor.source_sha256 == checkpoint_sha256(model_path):
+        return predictor
+
+    print(f"⚠️ {onnx_path} is stale for {model_path}, re-exporting")
+    try:
+        export_onnx(model_path, onnx_path)
+    except Exception as exc:
+        print(f"⚠️ ONNX re-export failed ({exc}), falling back to torch")
+        return None
+    return OnnxPredictor(onnx_path)
+
+
+if __name__ == "__main__":
+    print(f"✅ Exported {export_onnx()}")
@@ -0,0 +1,190 @@
+"""LRU cache for prediction results keyed by image content"""
+import functools
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+
+from backend.config import (
+    MODEL_PATH,
+    MODEL_FLAT_PATH,
+    PREDICTION_CACHE_MAX_ENTRIES,
+    PREDICTION_CACHE_MAX_BYTES,
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _file_sha256(path, size, mtime_ns):
+    # size + mtime are part of the key so a rewritten file is hashed again
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_flat_metadata(path):
+    """
+    The __metadata__ of a flat checkpoint header (see checkpoint.py) without
+    mapping the data; {} when the file is missing or unreadable
+    """
+    try:
+        with open(path, "rb") as f:
+            header_len, = struct.unpack("<Q", f.read(8))
+            return json.loads(f.read(header_len)).get("__metadata__", {})
+    except (OSError, ValueError, struct.error):
+        return {}
+
+
+def source_matches(metadata, st):
+    """Whether flat-checkpoint metadata was converted from this stat() version"""
+    return (
+        metadata.get("source_size") == str(st.st_size)
+        and metadata.get("source_mtime_ns") == str(st.st_mtime_ns)
+        and bool(metadata.get("source_sha256"))
+    )
+
+
+def checkpoint_sha256(path=MODEL_PATH, use_recorded=True):
+    """
+    SHA-256 of a checkpoint file, hashed once per file version
+
+    For MODEL_PATH the hash recorded by the flat conversion is reused while
+    the file's size and mtime are unchanged, so a process start reads no
+    weights to identify them. `use_recorded=False` always hashes the file.
+    """
+    st = os.stat(path)
+    if use_recorded and os.path.abspath(path) == os.path.abspath(MODEL_PATH):
+        recorded = _recorded_sha256(st)
+        if recorded is not None:
+            return recorded
+    return _file_sha256(path, st.st_size, st.st_mtime_ns)
+
+
+def _recorded_sha256(st):
+    try:
+        flat = os.stat(MODEL_FLAT_PATH)
+    except OSError:
+        return None
+    metadata = _cached_flat_metadata(MODEL_FLAT_PATH, flat.st_size, flat.st_mtime_ns)
+    return metadata["source_sha256"] if source_matches(metadata, st) else None
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_flat_metadata(path, size, mtime_ns):
+    # Called for every prediction via image_key: read each header version once
+    return read_flat_metadata(path)
+
+
+def checkpoint_identity(path=MODEL_PATH):
+    """
+    Identify the model checkpoint on disk so a replaced
+    best_model.pth never serves stale predictions
+
+    This is the SHA-256 of the source `.pth`. The flat and ONNX copies
+    record that hash and are regenerated when it changes, so it identifies
+    the served weights whichever format is loaded.
+    """
+    try:
+        return checkpoint_sha256(path)
+    except OSError:
+        return path
+
+
+def image_key(pil_image, checkpoint=None):
+    """
+    Hash the decoded pixels of an image together with the checkpoint identity
+
+    Args:
+        pil_image (PIL.Image): Input image
+        checkpoint (str): Checkpoint identity (defaults to MODEL_PATH's)
+
+    Returns:
+        str: Hex digest usable as a cache key
+    """
+    if checkpoint is None:
+        checkpoint = checkpoint_identity()
+
+    h = hashlib.blake2b(digest_size=20)
+    h.update(checkpoint.encode())
+    h.update(f"{pil_image.mode}:{pil_image.size}".encode())
+    h.update(pil_image.tobytes())
+    return h.hexdigest()
+
+
+def _result_size(result):
+    """Rough in-memory size of a prediction dict in bytes"""
+    size = sys.getsizeof(result) + sys.getsizeof(result["probabilities"])
+    for name, prob in result["probabilities"].items():
+        size += sys.getsizeof(name) + sys.getsizeof(prob)
+    return size + sys.getsizeof(result["prediction"])
+
+
+def _copy_result(result):
+    return {**result, "probabilities": dict(result["probabilities"])}
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache bounded by entry count and approximate memory
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_MAX_ENTRIES,
+                 max_bytes=PREDICTION_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy_result(entry[0])
+
+    def put(self, key, result):
+        size = _result_size(result)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (_copy_result(result), size)
+            self._bytes += size
+
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,189 @@
+"""
+Multi-process CPU inference with model weights in shared memory
+
+Workers serve the configured INFERENCE_BACKEND, so results match the
+single-process path. The eager backend keeps the parent's shared-memory
+tensors. TorchScript, channels_last and int8 build their own converted copy
+in each worker, and ONNX opens one ONNX Runtime session per worker.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+import torch.multiprocessing as torch_mp
+
+# ===============================
+# WORKER SIDE
+# ===============================
+_worker_model = None
+_worker_onnx = None
+_worker_preprocessor = None
+_worker_barrier = None
+
+WARMUP_TIMEOUT_S = 120
+
+
+def _init_worker(state_dict, num_classes, num_threads, backend, calibration_batches, barrier):
+    """
+    Build the model around the parent's shared-memory tensors
+
+    The model is created on the meta device (no allocation) and the shared
+    tensors are assigned as its parameters and buffers, so every worker maps
+    the same physical weights instead of holding a private copy. Backends
+    other than eager are then built from it as in the parent process.
+    """
+    global _worker_model, _worker_onnx, _worker_preprocessor, _worker_barrier
+    from backend.models.preprocessing import Preprocessor
+
+    # Workers × threads must not exceed the cores of the box
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    torch.set_grad_enabled(False)
+
+    _worker_preprocessor = Preprocessor()
+    _worker_barrier = barrier
+
+    if backend == "onnx":
+        from backend.models.onnx_backend import OnnxPredictor
+        _worker_onnx = OnnxPredictor(intra_op_threads=num_threads)
+        return
+
+    from backend.models.model_architecture import SimpleCNN
+    from backend.models.inference_backends import build_backend
+
+    with torch.device("meta"):
+        model = SimpleCNN(num_classes=num_classes)
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+
+    _worker_model = build_backend(model, backend, calibration_batches)
+
+
+def _worker_predict(pixels):
+    start = time.perf_counter()
+    batch = _worker_preprocessor.normalize(pixels)
+    if _worker_onnx is not None:
+        probs = _worker_onnx.predict_proba(batch)
+    else:
+        probs = torch.softmax(_worker_model(torch.from_numpy(batch)), dim=1).numpy()
+    return os.getpid(), probs, time.perf_counter() - start
+
+
+def _worker_warmup(pixels):
+    """
+    Run one batch, then wait until every worker has done the same: a worker
+    blocked on the barrier cannot take a second warm-up task, so each of
+    the pool's workers receives exactly one
+    """
+    result = _worker_predict(pixels)
+    _worker_barrier.wait(WARMUP_TIMEOUT_S)
+    return result
+
+
+# ===============================
+# PARENT SIDE
+# ===============================
+class InferencePool:
+    """
+    Process pool serving softmax probabilities for chunks of images
+
+    The parent resizes each chunk to 224×224 uint8 pixels
+    (`Preprocessor.pixels`) before submitting it, so only ~150 KB per image
+    is pickled to the workers; they normalise and run the model.
+
+    Args:
+        state_dict (dict): SimpleCNN weights; moved to shared memory in place
+            (unused for the "onnx" backend)
+        num_classes (int): Output classes of the model
+        num_workers (int): Worker processes
+        threads_per_worker (int): Torch intra-op threads per worker
+            (defaults to an even split of the CPU cores)
+        backend (str): "onnx" or one of inference_backends.BACKENDS
+        calibration_batches (list[torch.Tensor]): Needed for "int8"
+    """
+
+    def __init__(self, state_dict, num_classes, num_workers, threads_per_worker=None,
+                 backend="eager", calibration_batches=None):
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // num_workers)
+
+        if backend != "onnx":
+            for tensor in state_dict.values():
+                tensor.share_memory_()
+
+        context = torch_mp.get_context("spawn")
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.backend = backend
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                state_dict, num_classes, threads_per_worker, backend,
+                calibration_batches, context.Barrier(num_workers),
+            ),
+        )
+
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._busy_s = defaultdict(float)
+        self._tasks = defaultdict(int)
+        self._images = defaultdict(int)
+
+    def predict_chunks(self, chunks):
+        """
+        Score each chunk on whichever worker is free, in parallel
+
+        Args:
+            chunks (list[np.ndarray]): [N, 224, 224, 3] uint8 pixel chunks
+
+        Returns:
+            list[np.ndarray]: [len(chunk), num_classes] probabilities per chunk
+        """
+        futures = [self._executor.submit(_worker_predict, chunk) for chunk in chunks]
+
+        results = []
+        for chunk, future in zip(chunks, futures):
+            pid, probs, busy_s = future.result()
+            with self._lock:
+                self._busy_s[pid] += busy_s
+                self._tasks[pid] += 1
+                self._images[pid] += len(chunk)
+            results.append(probs)
+        return results
+
+    def warmup(self, pixels):
+        """
+        Start every worker and run `pixels` through each one once, so no
+        request pays process start-up, model build or cold-kernel latency
+        """
+        futures = [
+            self._executor.submit(_worker_warmup, pixels) for _ in range(self.num_workers)
+        ]
+        return len({future.result()[0] for future in futures})
+
+    def stats(self):
+        """Per-worker task counts and utilisation (busy time / pool uptime)"""
+        with self._lock:
+            uptime = time.perf_counter() - self._started
+            return {
+                "workers": self.num_workers,
+                "threads_per_worker": self.threads_per_worker,
+                "backend": self.backend,
+                "per_worker": {
+                    pid: {
+                        "tasks": self._tasks[pid],
+                        "images": self._images[pid],
+                        "busy_s": self._busy_s[pid],
+                        "utilisation": self._busy_s[pid] / uptime if uptime else 0.0,
+                    }
+                    for pid in self._tasks
+                },
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
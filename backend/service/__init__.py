@@ -0,0 +1 @@
+"""Standalone inference HTTP service"""
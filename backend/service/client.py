@@ -0,0 +1,171 @@
+"""
+Thin client for the inference service
+
+Exposes the same functions as backend.models.model_predictor. When
+INFERENCE_SERVICE_URL is unset they run in-process instead, so the UI
+imports from here regardless of deployment.
+"""
+import base64
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from backend.config import (
+    INFERENCE_SERVICE_URL,
+    MICROBATCH_ENABLED,
+    INFERENCE_CLIENT_POOL_SIZE,
+    INFERENCE_CLIENT_TIMEOUT,
+    INFERENCE_SERVICE_MAX_BATCH,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    """Process-wide requests session with a keep-alive connection pool"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=INFERENCE_CLIENT_POOL_SIZE,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _encode_png(image):
+    buffer = BytesIO()
+    image.convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _decode_png(data):
+    return Image.open(BytesIO(base64.b64decode(data)))
+
+
+def _post(path, **kwargs):
+    response = _get_session().post(
+        INFERENCE_SERVICE_URL.rstrip("/") + path,
+        timeout=INFERENCE_CLIENT_TIMEOUT,
+        **kwargs,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _post_image(path, image, params=None):
+    return _post(
+        path,
+        data=_encode_png(image),
+        params=params,
+        headers={"Content-Type": "image/png"},
+    )
+
+
+# ===============================
+# PREDICTOR API
+# ===============================
+def predict_image(pil_image):
+    if not INFERENCE_SERVICE_URL:
+        from backend.models import model_predictor
+        if MICROBATCH_ENABLED:
+            return model_predictor.submit_prediction(pil_image).result()
+        return model_predictor.predict_image(pil_image)
+
+    return _post_image("/predict", pil_image)
+
+
+def predict_batch(images, batch_size=None):
+    if not INFERENCE_SERVICE_URL:
+        from backend.models.model_predictor import predict_batch as _local
+        return _local(images) if batch_size is None else _local(images, batch_size)
+
+    # The service caps images per request; larger batches become several requests
+    params = {"batch_size": batch_size} if batch_size is not None else None
+    results = []
+    for start in range(0, len(images), INFERENCE_SERVICE_MAX_BATCH):
+        encoded = [
+            base64.b64encode(_encode_png(img)).decode("ascii")
+            for img in images[start:start + INFERENCE_SERVICE_MAX_BATCH]
+        ]
+        results.extend(
+            _post("/predict_batch", json={"images": encoded}, params=params)["results"]
+        )
+    return results
+
+
+def predict_and_explain(pil_image):
+    if not INFERENCE_SERVICE_URL:
+        from backend.models.model_predictor import predict_and_explain as _local
+        return _local(pil_image)
+
+    payload = _post_image("/explain", pil_image)
+    return payload["result"], _decode_png(payload["gradcam"])
+
+
+def _explain(pil_image, method, class_names):
+    params = {"method": method}
+    if class_names is not None:
+        params["classes"] = list(class_names)
+
+    payload = _post_image("/explain", pil_image, params=params)
+    overlays = {
+        name: _decode_png(data)
+        for name, data in payload["class_overlays"].items()
+    }
+    return payload["result"], overlays, payload["info"]
+
+
+def predict_and_explain_batch(images, method="gradcam", class_names=None):
+    if not INFERENCE_SERVICE_URL:
+        from backend.models.model_predictor import predict_and_explain_batch as _local
+        return _local(images, method, class_names)
+
+    # The service explains one image per request
+    return [_explain(image, method, class_names) for image in images]
+
+
+def explain_image(pil_image, method="gradcam", class_names=None):
+    if not INFERENCE_SERVICE_URL:
+        from backend.models.model_predictor import explain_image as _local
+        return _local(pil_image, method, class_names)
+
+    _, overlays, info = _explain(pil_image, method, class_names)
+    return overlays, info
+
+
+def explain_all_classes(pil_image, method="gradcam"):
+    if not INFERENCE_SERVICE_URL:
+        from backend.models.model_predictor import explain_all_classes as _local
+        return _local(pil_image, method)
+
+    payload = _post_image(
+        "/explain", pil_image, params={"method": method, "classes": "all"}
+    )
+    return {
+        name: _decode_png(data)
+        for name, data in payload["class_overlays"].items()
+    }
+
+
+def get_cache_stats():
+    if not INFERENCE_SERVICE_URL:
+        from backend.models.model_predictor import get_cache_stats as _local
+        return _local()
+
+    response = _get_session().get(
+        INFERENCE_SERVICE_URL.rstrip("/") + "/health",
+        timeout=INFERENCE_CLIENT_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["cache"]
@@ -0,0 +1,313 @@
+"""
+ASGI inference server wrapping backend.models.model_predictor
+
+Run with:
+    uvicorn backend.service.server:app --port 8502 --workers 2
+or:
+    python -m backend.service.server
+
+Endpoints:
+    GET  /health          Model/backend status, startup timings, cache stats
+    POST /predict         Raw image bytes → prediction dict
+    POST /predict_batch   {"images": [base64, ...]} → {"results": [...]};
+                          ?batch_size=N sets images per forward pass, at
+                          most INFERENCE_SERVICE_MAX_BATCH images (413)
+    POST /explain         Raw image bytes → {"result", "gradcam"}; add
+                          ?method=<explainer>[&classes=all|<name>...] for
+                          {"result", "class_overlays": {name: base64},
+                          "info": {...}} from the explainer's forward pass
+    GET  /metrics         Prometheus text exposition (backend/metrics.py)
+
+Request bodies above INFERENCE_SERVICE_MAX_BODY_BYTES are rejected with
+413 before they are buffered.
+"""
+import asyncio
+import base64
+import binascii
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qs
+
+from PIL import Image
+
+from backend.config import (
+    CLASS_NAMES,
+    INFERENCE_BACKEND,
+    INFERENCE_SERVICE_HOST,
+    INFERENCE_SERVICE_MAX_BATCH,
+    INFERENCE_SERVICE_MAX_BODY_BYTES,
+    INFERENCE_SERVICE_PORT,
+    INFERENCE_SERVICE_THREADS,
+    MICROBATCH_ENABLED,
+    MODEL_WARMUP,
+)
+from backend import metrics
+from backend.models import model_predictor
+
+# Torch releases the GIL inside kernels, so a small pool keeps the event
+# loop free while several requests run inference
+_executor = ThreadPoolExecutor(
+    max_workers=INFERENCE_SERVICE_THREADS, thread_name_prefix="inference"
+)
+
+
+class RawResponse:
+    """Non-JSON handler result"""
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _decode_image(data):
+    try:
+        return Image.open(BytesIO(data)).convert("RGB")
+    except Exception:
+        raise HTTPError(400, "Request body is not a readable image")
+
+
+def _decode_base64_image(item):
+    try:
+        data = base64.b64decode(item, validate=True)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPError(400, "Image is not valid base64")
+    return _decode_image(data)
+
+
+def _positive_int(query, name, default):
+    try:
+        value = int(query.get(name, [default])[0])
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an integer")
+    if value < 1:
+        raise HTTPError(400, f"{name} must be >= 1")
+    return value
+
+
+def encode_png(image):
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+async def _run(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, func, *args)
+
+
+# ===============================
+# HANDLERS
+# ===============================
+# Decoding, encoding and anything that may load the model run on the
+# executor: on the event loop they would stall every other request.
+def _health():
+    payload = {
+        "status": "ok",
+        "backend": INFERENCE_BACKEND,
+        "startup": model_predictor.get_startup_report(),
+        "cache": model_predictor.get_cache_stats(),
+    }
+    if MICROBATCH_ENABLED:
+        payload["scheduler"] = model_predictor.get_scheduler_stats()
+    pool_stats = model_predictor.get_worker_pool_stats()
+    if pool_stats is not None:
+        payload["worker_pool"] = pool_stats
+    return payload
+
+
+async def health(body, query):
+    return await _run(_health)
+
+
+async def predict(body, query):
+    image = await _run(_decode_image, body)
+    if MICROBATCH_ENABLED:
+        # Concurrent requests share one batched forward pass
+        return await asyncio.wrap_future(model_predictor.submit_prediction(image))
+    return await _run(model_predictor.predict_image, image)
+
+
+def _decode_batch(body):
+    try:
+        encoded = json.loads(body)["images"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPError(400, 'Expected JSON body {"images": [base64, ...]}')
+
+    if not isinstance(encoded, list):
+        raise HTTPError(400, '"images" must be a list of base64 strings')
+    if len(encoded) > INFERENCE_SERVICE_MAX_BATCH:
+        raise HTTPError(413, f"At most {INFERENCE_SERVICE_MAX_BATCH} images per request")
+    return [_decode_base64_image(item) for item in encoded]
+
+
+async def predict_batch(body, query):
+    batch_size = _positive_int(query, "batch_size", model_predictor.DEFAULT_BATCH_SIZE)
+    images = await _run(_decode_batch, body)
+    return {"results": await _run(model_predictor.predict_batch, images, batch_size)}
+
+
+def _explain(body, method, class_names):
+    image = _decode_image(body)
+
+    if method is None:
+        result, overlay = model_predictor.predict_and_explain(image)
+        return {"result": result, "gradcam": encode_png(overlay)}
+
+    try:
+        (result, overlays, info), = model_predictor.predict_and_explain_batch(
+            [image], method, class_names
+        )
+    except ValueError as exc:
+        raise HTTPError(400, str(exc))
+
+    return {
+        "result": result,
+        "class_overlays": {
+            name: encode_png(overlay) for name, overlay in overlays.items()
+        },
+        "info": info,
+    }
+
+
+async def explain(body, query):
+    method, class_names = None, None
+    if "method" in query or "classes" in query:
+        method = query.get("method", ["gradcam"])[0]
+        class_names = query.get("classes")
+        if class_names == ["all"]:
+            class_names = list(CLASS_NAMES)
+        elif class_names is not None:
+            unknown = [name for name in class_names if name not in CLASS_NAMES]
+            if unknown:
+                raise HTTPError(
+                    400,
+                    f"Unknown class {unknown[0]!r}, expected 'all' or one of "
+                    f"{list(CLASS_NAMES)}",
+                )
+
+    return await _run(_explain, body, method, class_names)
+
+
+async def scrape_metrics(body, query):
+    return RawResponse(metrics.REGISTRY.render().encode(), metrics.CONTENT_TYPE)
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/metrics"): scrape_metrics,
+    ("POST", "/predict"): predict,
+    ("POST", "/predict_batch"): predict_batch,
+    ("POST", "/explain"): explain,
+}
+
+
+# ===============================
+# ASGI APPLICATION
+# ===============================
+def _content_length(scope):
+    for name, value in scope.get("headers", []):
+        if name.lower() == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                raise HTTPError(400, "Invalid Content-Length header")
+    return None
+
+
+async def _read_body(scope, receive):
+    # Content-Length rejects oversized uploads up front; the running total
+    # also covers chunked bodies that do not declare a length
+    too_large = HTTPError(
+        413, f"Request body exceeds {INFERENCE_SERVICE_MAX_BODY_BYTES} bytes"
+    )
+    length = _content_length(scope)
+    if length is not None and length > INFERENCE_SERVICE_MAX_BODY_BYTES:
+        raise too_large
+
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > INFERENCE_SERVICE_MAX_BODY_BYTES:
+            raise too_large
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send(send, status, body, content_type):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, payload):
+    await _send(send, status, json.dumps(payload).encode(), "application/json")
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                if MODEL_WARMUP:
+                    await _run(model_predictor.warmup_model)
+            except Exception as exc:
+                await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            _executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        await _send_json(send, 404, {"error": f"No route for {scope['method']} {scope['path']}"})
+        return
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+
+    try:
+        body = await _read_body(scope, receive)
+        payload = await handler(body, query)
+    except HTTPError as exc:
+        await _send_json(send, exc.status, {"error": exc.message})
+        return
+    except Exception as exc:
+        await _send_json(send, 500, {"error": str(exc)})
+        return
+
+    if isinstance(payload, RawResponse):
+        await _send(send, 200, payload.body, payload.content_type)
+        return
+    await _send_json(send, 200, payload)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=INFERENCE_SERVICE_HOST, port=INFERENCE_SERVICE_PORT)
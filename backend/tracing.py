@@ -0,0 +1,279 @@
+"""
+Hot-path timing spans for the prediction pipeline
+
+    from backend import tracing
+
+    with tracing.request("render_prediction"):
+        with tracing.span("decode"):
+            ...
+
+When tracing is off (the default) `span()` returns a shared no-op context
+manager, so an instrumented call costs one flag check. When on, each span
+feeds a per-stage latency histogram, is attached to the enclosing request
+(nested spans keep their depth) and, if Chrome tracing is enabled, is kept
+as a complete event for chrome://tracing / Perfetto.
+"""
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from backend.config import TRACING_ENABLED, TRACE_CHROME_EVENTS
+
+# Histogram bucket upper bounds (ms)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_enabled = TRACING_ENABLED
+_chrome_events = deque(maxlen=TRACE_CHROME_EVENTS) if TRACE_CHROME_EVENTS else None
+
+_lock = threading.Lock()
+_histograms = {}
+_last_requests = {}
+
+# Spans of the request running in this context, and the current nesting depth
+_current_request = contextvars.ContextVar("current_request", default=None)
+_depth = contextvars.ContextVar("span_depth", default=0)
+
+
+def enable(flag=True, chrome_events=None):
+    """
+    Turn tracing on or off at runtime
+
+    Args:
+        flag (bool): Record spans
+        chrome_events (int): Keep up to this many events for Chrome trace
+            export (0 disables, None keeps the current setting)
+    """
+    global _enabled, _chrome_events
+    _enabled = flag
+    if chrome_events is not None:
+        _chrome_events = deque(maxlen=chrome_events) if chrome_events else None
+
+
+def is_enabled():
+    return _enabled
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "duration_ms", "depth", "_token")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = _depth.get()
+        self._token = _depth.set(self.depth + 1)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        _depth.reset(self._token)
+        self.duration_ms = (end - self.start) / 1e6
+        _record(self, end)
+        return False
+
+
+def _record(span, end):
+    with _lock:
+        hist = _histograms.get(span.name)
+        if hist is None:
+            hist = _histograms[span.name] = {
+                "count": 0, "sum_ms": 0.0, "max_ms": 0.0, "buckets": [0] * (len(BUCKETS_MS) + 1),
+            }
+        hist["count"] += 1
+        hist["sum_ms"] += span.duration_ms
+        hist["max_ms"] = max(hist["max_ms"], span.duration_ms)
+        hist["buckets"][bisect.bisect_left(BUCKETS_MS, span.duration_ms)] += 1
+
+    spans = _current_request.get()
+    if spans is not None:
+        spans.append(span)
+
+    if _chrome_events is not None:
+        _chrome_events.append({
+            "name": span.name,
+            "ph": "X",
+            "ts": span.start / 1000,
+            "dur": (end - span.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        })
+
+
+def span(name):
+    """Context manager timing one pipeline stage (no-op while tracing is off)"""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def traced(name):
+    """Decorator form of `span`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class request:
+    """
+    Root span collecting every nested span of one request; the breakdown is
+    kept as the last request of that name (see `last_request`). Inside
+    another request it is an ordinary span of that request.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._span = None
+        self._token = None
+
+    def __enter__(self):
+        if not _enabled:
+            return self
+        if _current_request.get() is None:
+            self._spans = []
+            self._token = _current_request.set(self._spans)
+        self._span = _Span(self.name).__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        if self._span is None:
+            return False
+        self._span.__exit__(*exc)
+        if self._token is None:
+            return False
+        _current_request.reset(self._token)
+
+        root = self._span
+        _last_requests[self.name] = {
+            "name": self.name,
+            "total_ms": root.duration_ms,
+            "spans": [
+                {
+                    "name": s.name,
+                    "depth": s.depth - root.depth,
+                    "offset_ms": (s.start - root.start) / 1e6,
+                    "duration_ms": s.duration_ms,
+                }
+                for s in sorted(self._spans, key=lambda s: s.start)
+            ],
+        }
+        return False
+
+
+@contextlib.contextmanager
+def collect_spans():
+    """
+    Record the spans inside the block into the yielded list instead of the
+    current request, e.g. for work done on a thread serving other callers
+    (pass the list to `adopt_spans` in each caller's context)
+    """
+    spans = []
+    if not _enabled:
+        yield spans
+        return
+    request_token = _current_request.set(spans)
+    depth_token = _depth.set(0)
+    try:
+        yield spans
+    finally:
+        _depth.reset(depth_token)
+        _current_request.reset(request_token)
+
+
+def adopt_spans(spans):
+    """
+    Add spans collected elsewhere to the request of the current context,
+    nested at the current depth; they are not recorded in the histograms
+    or Chrome events again
+    """
+    request_spans = _current_request.get()
+    if request_spans is None:
+        return
+    depth = _depth.get()
+    for collected in spans:
+        adopted = _Span(collected.name)
+        adopted.start = collected.start
+        adopted.duration_ms = collected.duration_ms
+        adopted.depth = collected.depth + depth
+        request_spans.append(adopted)
+
+
+# ===============================
+# EXPORT
+# ===============================
+def last_request(name):
+    """Breakdown of the most recent request of that name, or None"""
+    return _last_requests.get(name)
+
+
+def histograms():
+    """
+    Per-stage latency histograms
+
+    Returns:
+        dict: stage -> count, sum_ms, mean_ms, max_ms, p50_ms, p95_ms and
+        cumulative `buckets` as [(upper bound ms, count), ...]
+    """
+    with _lock:
+        snapshot = {name: dict(h, buckets=list(h["buckets"])) for name, h in _histograms.items()}
+
+    bounds = BUCKETS_MS + (float("inf"),)
+    for hist in snapshot.values():
+        cumulative, total = [], 0
+        for bound, count in zip(bounds, hist["buckets"]):
+            total += count
+            cumulative.append((bound, total))
+        hist["buckets"] = cumulative
+        hist["mean_ms"] = hist["sum_ms"] / hist["count"]
+        # Upper bound of the bucket holding the quantile (capped at the max seen)
+        for q in (50, 95):
+            rank = hist["count"] * q / 100
+            bound = next(b for b, c in cumulative if c >= rank)
+            hist[f"p{q}_ms"] = min(bound, hist["max_ms"])
+    return snapshot
+
+
+def chrome_trace():
+    """Recorded spans in Chrome trace-event JSON format (chrome://tracing, Perfetto)"""
+    events = list(_chrome_events) if _chrome_events is not None else []
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path):
+    with open(path, "w") as f:
+        json.dump(chrome_trace(), f)
+    return path
+
+
+def reset():
+    """Drop recorded histograms, requests and Chrome events"""
+    with _lock:
+        _histograms.clear()
+    _last_requests.clear()
+    if _chrome_events is not None:
+        _chrome_events.clear()
@@ -0,0 +1,241 @@
+"""
+Latency / throughput benchmark of the prediction, Grad-CAM and report paths
+
+    python -m benchmarks.inference_benchmark --output bench.json
+    python -m benchmarks.inference_benchmark --output new.json --compare bench.json
+
+Every case runs on synthetic noise images (distinct pixels per iteration,
+so the prediction cache never hits) after a few untimed warm-up calls.
+Results hold p50/p95/p99 latency, throughput and the peak RSS of each
+case, and are written as JSON. The kernel's RSS high-water mark is reset
+before every case (Linux only; elsewhere the peak is None), so a case's
+peak is its own, not that of the largest case run before it. With
+--compare the run is checked against a previous one and exits non-zero
+when any case's p50 regressed by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+RESOLUTIONS = (224, 512, 1024)
+BATCH_SIZES = (1, 8, 32)
+
+
+def synthetic_images(count, resolution, seed=0):
+    """`count` distinct RGB noise images of `resolution` x `resolution`"""
+    rng = np.random.default_rng(seed)
+    return [
+        Image.fromarray(rng.integers(0, 256, (resolution, resolution, 3), dtype=np.uint8))
+        for _ in range(count)
+    ]
+
+
+def reset_peak_rss():
+    """
+    Lower this process' RSS high-water mark to its current RSS
+
+    Returns:
+        bool: False where the kernel cannot reset it (not Linux >= 4.0)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """RSS high-water mark (VmHWM) since the last `reset_peak_rss`"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+
+def _measure(name, params, func, inputs, warmup, items_per_call=1):
+    tracks_peak = reset_peak_rss()
+    for arg in inputs[:warmup]:
+        func(arg)
+
+    latencies = []
+    for arg in inputs[warmup:]:
+        start = time.perf_counter()
+        func(arg)
+        latencies.append(time.perf_counter() - start)
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    result = {
+        "name": name,
+        "params": params,
+        "iterations": len(latencies),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "throughput_per_sec": round(items_per_call * len(latencies) / sum(latencies), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1) if tracks_peak else None,
+    }
+    print(
+        f"⏱️ {name} {params}: p50 {result['p50_ms']:.1f} ms, "
+        f"p99 {result['p99_ms']:.1f} ms, {result['throughput_per_sec']:.1f}/s"
+    )
+    return result
+
+
+# ===============================
+# CASES
+# ===============================
+def run_benchmarks(iterations=20, warmup=3, resolutions=RESOLUTIONS, batch_sizes=BATCH_SIZES):
+    """
+    Run every benchmark case
+
+    Returns:
+        list[dict]: One result per (case, parameters)
+    """
+    from backend.config import CLASS_NAMES
+    from backend.models import model_predictor
+    from backend.gradcam.gradcam import get_gradcam, generate_real_gradcam
+    from utils.pdf_generator import generate_pdf_report
+
+    model = model_predictor._load_model()
+    device = model_predictor.get_device()
+    transform = model_predictor._get_transform()
+    gradcam = get_gradcam(model)
+    model_predictor.clear_prediction_cache()
+
+    calls = iterations + warmup
+    results = []
+
+    for resolution in resolutions:
+        images = synthetic_images(calls, resolution, seed=resolution)
+        results.append(_measure(
+            "predict_image", {"resolution": resolution},
+            model_predictor.predict_image, images, warmup,
+        ))
+        results.append(_measure(
+            "generate_real_gradcam", {"resolution": resolution},
+            lambda img: generate_real_gradcam(model, img, transform, device, 0), images, warmup,
+        ))
+
+    for batch_size in batch_sizes:
+        images = synthetic_images(calls * batch_size, 224, seed=batch_size)
+        batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+        results.append(_measure(
+            "predict_batch", {"resolution": 224, "batch_size": batch_size},
+            lambda batch: model_predictor.predict_batch(batch, batch_size), batches, warmup,
+            items_per_call=batch_size,
+        ))
+
+        # generate() explains a single image; larger batches use generate_batch()
+        tensors = [transform.batch(batch).to(device) for batch in batches]
+        if batch_size == 1:
+            name, explain = "GradCAM.generate", lambda tensor: gradcam.generate(tensor, 0)
+        else:
+            name, explain = "GradCAM.generate_batch", lambda tensor: gradcam.generate_batch(tensor, [0])
+        results.append(_measure(
+            name, {"batch_size": batch_size}, explain, tensors, warmup,
+            items_per_call=batch_size,
+        ))
+
+    record = {
+        "timestamp": "2026-01-01 00:00:00",
+        "image_name": "synthetic.png",
+        "prediction": "normal",
+        "confidence": 0.9,
+        "confidence_level": "High",
+    }
+    probabilities = dict(zip(CLASS_NAMES, [0.025] * 4 + [0.9]))
+    results.append(_measure(
+        "generate_pdf_report", {"gradcam": False},
+        lambda _: generate_pdf_report(record, probabilities), [None] * calls, warmup,
+    ))
+    for resolution in resolutions:
+        overlays = synthetic_images(calls, resolution, seed=resolution + 1)
+        results.append(_measure(
+            "generate_pdf_report", {"gradcam": True, "resolution": resolution},
+            lambda overlay: generate_pdf_report(record, probabilities, overlay), overlays, warmup,
+        ))
+
+    return results
+
+
+def environment():
+    import torch
+    from backend.config import INFERENCE_BACKEND
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "inference_backend": INFERENCE_BACKEND,
+    }
+
+
+# ===============================
+# REGRESSION CHECK
+# ===============================
+def _case_key(result):
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Compare p50 latency per case against a baseline run
+
+    Returns:
+        list[dict]: Cases slower than baseline by more than `threshold`
+    """
+    previous = {_case_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        marker = "❌" if ratio > 1 + threshold else "✅"
+        print(f"{marker} {result['name']} {result['params']}: {before['p50_ms']:.1f} → {result['p50_ms']:.1f} ms ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append({**result, "baseline_p50_ms": before["p50_ms"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark inference, Grad-CAM and PDF report paths")
+    parser.add_argument("--output", "-o", default="benchmark_results.json")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--resolutions", type=int, nargs="+", default=list(RESOLUTIONS))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": environment(),
+        "results": run_benchmarks(args.iterations, args.warmup, args.resolutions, args.batch_sizes),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
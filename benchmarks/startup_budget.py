@@ -0,0 +1,126 @@
+"""
+Cold-start import budget of the Streamlit app
+
+    python -m benchmarks.startup_budget
+    python -m benchmarks.startup_budget --output startup.json --compare baseline.json
+
+Runs app.py once in a fresh interpreter (bare Streamlit mode, model warm-up
+off) under `python -X importtime`, then reports the import time, the
+heaviest top-level imports and the wall-clock time of the first run.
+Exits non-zero when a heavy module (torch, pandas, reportlab, ...) is
+imported before any page needs it, or when the total exceeds --budget-ms.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only the page that uses them (or the model warm-up) may import these
+FORBIDDEN_MODULES = ("torch", "torchvision", "cv2", "reportlab", "pandas", "pyarrow", "onnxruntime")
+
+# Default ceiling for the total import time of a cold start
+IMPORT_BUDGET_MS = 1500
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# importlib.import_module (used for the lazy pages) is not logged by
+# -X importtime, so the loaded modules are read from sys.modules instead
+_DRIVER = """
+import json, runpy, sys, time
+start = time.perf_counter()
+runpy.run_path("app.py")
+print(json.dumps({"wall_ms": (time.perf_counter() - start) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Top-level entries of `-X importtime` output
+
+    Returns:
+        list[dict]: module, self_ms, cumulative_ms (heaviest first)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match and match.group(3) == " ":
+            entries.append({
+                "module": match.group(4),
+                "self_ms": int(match.group(1)) / 1000,
+                "cumulative_ms": int(match.group(2)) / 1000,
+            })
+    return sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)
+
+
+def measure_startup():
+    """Run app.py cold in a subprocess and collect its import profile"""
+    env = dict(os.environ, MODEL_WARMUP="0", INFERENCE_TRACING="0")
+    env.pop("METRICS_PORT", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _DRIVER],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    run = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    modules = set(run["modules"])
+
+    return {
+        "import_ms": round(sum(e["cumulative_ms"] for e in imports), 1),
+        "wall_ms": round(run["wall_ms"], 1),
+        "module_count": len(modules),
+        "heaviest": imports[:15],
+        "forbidden": sorted(
+            name for name in FORBIDDEN_MODULES
+            if name in modules or any(m.startswith(name + ".") for m in modules)
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the Streamlit app's cold-start import budget")
+    parser.add_argument("--output", "-o", help="write the measurement as JSON")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="maximum total import time")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed import-time growth (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = measure_startup()
+    print(
+        f"⏱️ Cold start: {report['import_ms']:.0f} ms importing {report['module_count']} modules, "
+        f"{report['wall_ms']:.0f} ms first run"
+    )
+    for entry in report["heaviest"][:10]:
+        print(f"   {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+
+    failures = []
+    if report["forbidden"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(report['forbidden'])}")
+    if report["import_ms"] > args.budget_ms:
+        failures.append(f"import time {report['import_ms']:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        ratio = report["import_ms"] / baseline["import_ms"] if baseline["import_ms"] else 1.0
+        print(f"{'❌' if ratio > 1 + args.threshold else '✅'} Import time {baseline['import_ms']:.0f} → {report['import_ms']:.0f} ms ({ratio:.2f}x)")
+        if ratio > 1 + args.threshold:
+            failures.append(f"import time grew by more than {args.threshold:.0%}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Startup within budget")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Resume, decode failures and output schema of the batch-scoring CLI"""
+import csv
+import os
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from backend.config import CLASS_NAMES
+from backend.models import batch_scoring, model_predictor
+from backend.models.model_architecture import SimpleCNN
+
+
+@pytest.fixture
+def images(tmp_path):
+    source = tmp_path / "studies"
+    os.makedirs(source)
+    for i in range(5):
+        Image.new("RGB", (8, 8), (i, i, i)).save(source / f"{i}.png")
+    (source / "broken.png").write_bytes(b"not an image")
+    return str(source)
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Uniform probabilities; `fail_after` calls raise like an interrupted run"""
+    calls = {"count": 0, "fail_after": None}
+
+    def predict_chunks(chunks):
+        calls["count"] += 1
+        if calls["fail_after"] is not None and calls["count"] > calls["fail_after"]:
+            raise KeyboardInterrupt
+        return [np.full((len(chunk), len(CLASS_NAMES)), 1 / len(CLASS_NAMES)) for chunk in chunks]
+
+    monkeypatch.setattr(model_predictor, "predict_chunks", predict_chunks)
+    return calls
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def test_interrupted_run_resumes_without_repeating_rows(tmp_path, images, fake_model):
+    output = str(tmp_path / "scores.csv")
+    fake_model["fail_after"] = 1
+    with pytest.raises(KeyboardInterrupt):
+        batch_scoring.score_directory(images, output, batch_size=2, log_every=0)
+    _, partial = _read_csv(output)
+    assert len(partial) == 2
+
+    fake_model["fail_after"] = None
+    stats = batch_scoring.score_directory(images, output, batch_size=2, log_every=0)
+
+    _, rows = _read_csv(output)
+    assert stats["skipped"] == 2
+    assert sorted(row["path"] for row in rows) == sorted(batch_scoring.iter_image_paths(images))
+
+
+def test_undecodable_file_is_recorded_and_skipped(tmp_path, images, fake_model):
+    output = str(tmp_path / "scores.csv")
+    stats = batch_scoring.score_directory(images, output, batch_size=4, log_every=0)
+
+    _, rows = _read_csv(output)
+    broken, = [row for row in rows if row["path"].endswith("broken.png")]
+    assert stats["scored"] == 5 and stats["failed"] == 1
+    assert broken["prediction"] == "" and broken["error"].startswith("UnidentifiedImageError")
+    assert all(row["error"] == "" for row in rows if row is not broken)
+
+
+def test_csv_schema_and_prediction_cache_untouched(tmp_path, images, monkeypatch):
+    torch.manual_seed(0)
+    model = SimpleCNN().eval()
+    monkeypatch.setattr(model_predictor, "_load_model", lambda: model)
+    model_predictor.clear_prediction_cache()
+    output = str(tmp_path / "scores.csv")
+
+    batch_scoring.score_directory(images, output, batch_size=4, log_every=0)
+
+    fields, rows = _read_csv(output)
+    assert fields == batch_scoring.OUTPUT_FIELDS
+    row = next(row for row in rows if not row["error"])
+    assert row["prediction"] in CLASS_NAMES
+    assert sum(float(row[name]) for name in CLASS_NAMES) == pytest.approx(1, abs=1e-4)
+    # Bulk scoring must not evict the interactive cache entries
+    assert model_predictor.get_cache_stats()["entries"] == 0
+
+
+def test_parquet_schema(tmp_path, images, fake_model):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = str(tmp_path / "scores.parquet")
+
+    batch_scoring.score_directory(images, output, batch_size=4, log_every=0)
+
+    table = pq.read_table(output)
+    assert table.column_names == batch_scoring.OUTPUT_FIELDS
+    assert table.schema.field("confidence").type == "double"
+    assert table.num_rows == 6
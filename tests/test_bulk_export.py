@@ -0,0 +1,36 @@
+"""Multi-page PDF and ZIP exports of the prediction history"""
+import re
+import zipfile
+
+from utils.bulk_export import export_history_pdf, export_history_zip
+
+
+def _record(i, classes=5):
+    probabilities = {f"class_{c}": 1 / classes for c in range(classes)}
+    return {
+        "timestamp": f"2026-01-01 00:00:{i:02d}", "image_name": f"{i}.png",
+        "prediction": "class_0", "confidence": 0.9, "confidence_level": "High",
+        "probabilities": probabilities,
+    }
+
+
+def _pages(pdf):
+    return len(re.findall(rb"/Type /Page\b", pdf.read()))
+
+
+def test_pdf_has_a_page_per_record():
+    with export_history_pdf(_record(i) for i in range(25)) as pdf:
+        assert _pages(pdf) == 25
+
+
+def test_long_report_continues_on_the_next_page():
+    # A probability table taller than a page is split, not dropped
+    with export_history_pdf([_record(0, classes=60), _record(1)]) as pdf:
+        assert _pages(pdf) == 3
+
+
+def test_zip_has_a_pdf_per_record_and_the_csv():
+    with export_history_zip(_record(i) for i in range(3)) as archive:
+        names = zipfile.ZipFile(archive).namelist()
+    assert len([n for n in names if n.endswith(".pdf")]) == 3
+    assert "predictions.csv" in names
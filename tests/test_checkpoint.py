@@ -0,0 +1,50 @@
+"""Flat checkpoint loading must not re-hash the weights on every start"""
+import os
+
+import pytest
+import torch
+
+from backend.models import checkpoint, prediction_cache
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    pth, flat = str(tmp_path / "model.pth"), str(tmp_path / "model.safetensors")
+    torch.save({"weight": torch.randn(8, 4), "bias": torch.zeros(8)}, pth)
+    monkeypatch.setattr(prediction_cache, "MODEL_PATH", pth)
+    monkeypatch.setattr(prediction_cache, "MODEL_FLAT_PATH", flat)
+
+    hashed = []
+    file_sha256 = prediction_cache._file_sha256.__wrapped__
+    monkeypatch.setattr(
+        prediction_cache, "_file_sha256", lambda *args: hashed.append(args) or file_sha256(*args)
+    )
+    return pth, flat, hashed
+
+
+def test_unchanged_source_is_mapped_without_hashing(paths):
+    pth, flat, hashed = paths
+    checkpoint.load_checkpoint(flat, pth)
+    assert len(hashed) == 1  # the conversion
+
+    state_dict = checkpoint.load_checkpoint(flat, pth)
+    source = prediction_cache.checkpoint_sha256(pth)
+
+    assert len(hashed) == 1
+    assert source == checkpoint.read_metadata(flat)["source_sha256"]
+    assert torch.equal(state_dict["weight"], torch.load(pth)["weight"])
+
+
+def test_replaced_source_is_converted_again(paths):
+    pth, flat, _ = paths
+    checkpoint.load_checkpoint(flat, pth)
+
+    retrained = {"weight": torch.randn(8, 4), "bias": torch.ones(8)}
+    torch.save(retrained, pth)
+    st = os.stat(pth)
+    os.utime(pth, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+
+    state_dict = checkpoint.load_checkpoint(flat, pth)
+    assert torch.equal(state_dict["bias"], retrained["bias"])
+    assert checkpoint.read_metadata(flat)["source_sha256"] == \
+        prediction_cache.checkpoint_sha256(pth, use_recorded=False)
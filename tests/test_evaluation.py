@@ -0,0 +1,46 @@
+"""Reuse of the labelled-folder scan behind the Evaluation page"""
+import os
+
+import pytest
+from PIL import Image
+
+from backend.config import CLASS_NAMES
+from backend.models import evaluation
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for name in CLASS_NAMES[:2]:
+        os.makedirs(tmp_path / name)
+        Image.new("RGB", (8, 8)).save(tmp_path / name / "a.png")
+
+    scans = []
+    labelled_images = evaluation.labelled_images
+    monkeypatch.setattr(
+        evaluation, "labelled_images", lambda path: scans.append(path) or labelled_images(path)
+    )
+    return str(tmp_path), scans
+
+
+def test_unchanged_folder_is_scanned_once(data_dir):
+    path, scans = data_dir
+    first = evaluation.scan_dataset(path)
+    assert evaluation.scan_dataset(path) == first
+    assert len(scans) == 1
+
+
+def test_added_image_is_picked_up(data_dir):
+    path, scans = data_dir
+    _, before = evaluation.scan_dataset(path)
+    Image.new("RGB", (8, 8)).save(os.path.join(path, CLASS_NAMES[0], "b.png"))
+    os.utime(os.path.join(path, CLASS_NAMES[0]), ns=(0, 1))  # coarse mtime filesystems
+
+    samples, after = evaluation.scan_dataset(path)
+    assert len(samples) == 3 and after != before
+
+
+def test_expired_scan_is_redone(data_dir):
+    path, scans = data_dir
+    evaluation.scan_dataset(path)
+    evaluation.scan_dataset(path, max_age_s=0)
+    assert len(scans) == 2
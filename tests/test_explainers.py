@@ -0,0 +1,35 @@
+"""Explainer result cache and Score-CAM latency budget"""
+import pytest
+import torch
+
+from backend.gradcam.explainers import Explainer, grad_cam, score_cam
+from backend.gradcam.gradcam import GradCAM
+from backend.models.model_architecture import SimpleCNN
+
+
+@pytest.fixture(scope="module")
+def gradcam():
+    torch.manual_seed(0)
+    model = SimpleCNN().eval()
+    return GradCAM(model, model.backbone.layer4)
+
+
+def test_truncated_scorecam_is_not_cached(gradcam):
+    # A budget this small stops Score-CAM after its first chunk of channels
+    explainer = Explainer("scorecam", "Score-CAM", score_cam, latency_budget_ms=1e-3, cache_size=4)
+    x = torch.randn(1, 3, 64, 64)
+
+    *_, info = explainer.explain(gradcam, x, cache_key="image")
+    assert not info["complete"]
+    *_, info = explainer.explain(gradcam, x, cache_key="image")
+    assert not info["cached"]
+
+
+def test_complete_result_is_cached(gradcam):
+    explainer = Explainer("gradcam", "Grad-CAM", grad_cam, latency_budget_ms=60000, cache_size=4)
+    x = torch.randn(1, 3, 64, 64)
+
+    cams, *_, info = explainer.explain(gradcam, x, cache_key="image")
+    assert info["complete"] and not info["cached"]
+    cached, *_, info = explainer.explain(gradcam, x, cache_key="image")
+    assert info["cached"] and cached is cams
@@ -0,0 +1,38 @@
+"""Grad-CAM on the shared model while other threads run forward passes"""
+import threading
+
+import torch
+
+from backend.gradcam.gradcam import get_gradcam
+from backend.models.model_architecture import SimpleCNN
+
+
+def test_concurrent_forwards_do_not_clobber_the_capture():
+    torch.manual_seed(0)
+    model = SimpleCNN().eval()
+    gradcam = get_gradcam(model)
+    x = torch.randn(1, 3, 64, 64)
+    expected = gradcam.generate_batch(x, [0, 1])
+
+    stop = threading.Event()
+
+    def predict():
+        with torch.no_grad():
+            while not stop.is_set():
+                model(torch.randn(2, 3, 64, 64))
+
+    threads = [threading.Thread(target=predict) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(20):
+            torch.testing.assert_close(
+                torch.as_tensor(gradcam.generate_batch(x, [0, 1])), torch.as_tensor(expected)
+            )
+            torch.testing.assert_close(
+                torch.as_tensor(gradcam.generate(x, 0)), torch.as_tensor(expected[0, 0])
+            )
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,87 @@
+"""Keyset pagination and session scoping of the prediction history"""
+import sqlite3
+
+import pytest
+
+from utils.history_store import HistoryStore
+
+
+@pytest.fixture
+def store():
+    store = HistoryStore(":memory:")
+    # Seven records per second, so pages split runs of equal timestamps
+    store.extend([
+        {
+            "timestamp": f"2026-01-01 00:00:{i // 7:02d}",
+            "image_name": str(i),
+            "prediction": "AB"[i % 2],
+            "confidence": 0.9,
+            "confidence_level": "High",
+        }
+        for i in range(100)
+    ])
+    return store
+
+
+def _all_pages(store, page_size, **filters):
+    names, cursor = [], None
+    while True:
+        records, cursor = store.page(cursor, page_size, **filters)
+        names.extend(int(r["image_name"]) for r in records)
+        if cursor is None:
+            return names
+
+
+@pytest.mark.parametrize("page_size", [1, 10, 33, 100, 200])
+def test_pages_cover_every_record_once_newest_first(store, page_size):
+    assert _all_pages(store, page_size) == list(range(99, -1, -1))
+
+
+def test_pages_apply_filters(store):
+    assert _all_pages(store, 10, prediction="B") == list(range(99, 0, -2))
+
+
+@pytest.mark.parametrize("filters", [{}, {"prediction": "A"}, {"confidence_level": "High"}])
+def test_next_page_seeks_the_index(store, filters):
+    where, params = store._where(**filters)
+    where += (" AND " if where else " WHERE ") + "(timestamp, id) < (?, ?)"
+    plan = " ".join(row[-1] for row in store._connect().execute(
+        f"EXPLAIN QUERY PLAN SELECT id FROM predictions{where} "
+        "ORDER BY timestamp DESC, id DESC LIMIT 11",
+        params + ["2026-01-01 00:00:07", 50],
+    ))
+    assert "timestamp<" in plan and "TEMP B-TREE" not in plan
+
+
+def test_is_empty():
+    assert HistoryStore(":memory:").is_empty()
+
+
+def test_session_filter_hides_other_sessions(store):
+    store.extend([
+        {"session_id": session, "timestamp": "2026-01-02 00:00:00", "image_name": session,
+         "prediction": "A", "confidence": 0.9, "confidence_level": "High", "study_id": session}
+        for session in ("s1", "s2")
+    ])
+
+    records, _ = store.page(session_id="s1")
+    assert [r["image_name"] for r in records] == ["s1"]
+    assert [r["image_name"] for r in store.iter_records(session_id="s2")] == ["s2"]
+    assert store.distinct("study_id", session_id="s1") == ["s1"]
+    assert store.is_empty(session_id="s3")
+
+
+def test_database_without_sessions_is_migrated(tmp_path):
+    path = str(tmp_path / "history.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE predictions (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, "
+            "study_id TEXT, image_name TEXT, prediction TEXT NOT NULL, confidence REAL NOT NULL, "
+            "confidence_level TEXT NOT NULL, probabilities TEXT)"
+        )
+        conn.execute("INSERT INTO predictions VALUES (1, '2026-01-01', NULL, 'old', 'A', 0.9, 'High', NULL)")
+    conn.close()
+
+    store = HistoryStore(path)
+    assert store.is_empty(session_id="s1")
+    assert [r["image_name"] for r in store.page()[0]] == ["old"]
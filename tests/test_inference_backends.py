@@ -0,0 +1,45 @@
+"""Every CPU backend must match eager fp32 within its tolerance"""
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from backend.models.inference_backends import (
+    BACKENDS,
+    MAX_PROB_DELTA,
+    backend_failures,
+    compare_backends,
+)
+from backend.models.model_architecture import SimpleCNN
+from backend.models.preprocessing import Preprocessor
+
+
+@pytest.fixture(scope="module")
+def report():
+    torch.manual_seed(0)
+    model = SimpleCNN().eval()
+
+    rng = np.random.default_rng(0)
+    images = [
+        Image.fromarray(rng.integers(0, 256, (64, 64, 3), dtype=np.uint8))
+        for _ in range(16)
+    ]
+    inputs = Preprocessor().batch(images)
+    return compare_backends(
+        model, inputs, calibration_batches=[inputs[:8], inputs[8:]], repeats=1
+    )
+
+
+@pytest.mark.parametrize("mode", BACKENDS)
+def test_backend_within_tolerance(report, mode):
+    result = report[mode]
+
+    assert result["max_prob_delta"] <= MAX_PROB_DELTA[mode]
+    assert result["decisive_top1_agreement"] == 1.0
+    if MAX_PROB_DELTA[mode] <= 1e-4:
+        assert result["top1_agreement"] == 1.0
+
+
+def test_failures_are_reported():
+    report = {"int8": {"max_prob_delta": 0.2, "decisive_top1_agreement": 0.5}}
+    assert len(backend_failures(report)) == 2
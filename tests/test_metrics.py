@@ -0,0 +1,32 @@
+"""Scraping sharded metrics while other threads record into them"""
+import threading
+
+from backend.metrics import Counter, Histogram, resident_memory_bytes
+
+
+def _scrape_while_recording(metric, record, labels=20000):
+    """Sum the shards in a loop while a writer thread adds new label sets"""
+    thread = threading.Thread(target=lambda: [record(i) for i in range(labels)])
+    thread.start()
+    try:
+        while thread.is_alive():
+            metric._totals()
+    finally:
+        thread.join()
+    return metric._totals()
+
+
+def test_histogram_collect_survives_concurrent_new_labels():
+    histogram = Histogram("test_latency_seconds", "test", ["endpoint"])
+    totals = _scrape_while_recording(histogram, lambda i: histogram.observe(0.01, f"e{i}"))
+    assert len(totals) == 20000
+
+
+def test_counter_collect_survives_concurrent_new_labels():
+    counter = Counter("test_total", "test", ["name"])
+    totals = _scrape_while_recording(counter, lambda i: counter.inc(f"n{i}"))
+    assert sum(totals.values()) == 20000
+
+
+def test_resident_memory_is_reported():
+    assert resident_memory_bytes() > 0
@@ -0,0 +1,21 @@
+"""Prediction cache contents across the predict and explain paths"""
+import numpy as np
+import torch
+from PIL import Image
+
+from backend.models import model_predictor
+from backend.models.model_architecture import SimpleCNN
+
+
+def test_explain_path_does_not_fill_the_prediction_cache(monkeypatch):
+    torch.manual_seed(0)
+    model = SimpleCNN().eval()
+    monkeypatch.setattr(model_predictor, "_load_model", lambda: model)
+    model_predictor.clear_prediction_cache()
+    image = Image.fromarray(np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8))
+
+    (result, overlays, _), = model_predictor.predict_and_explain_batch([image])
+
+    assert result["prediction"] in overlays
+    # Eager fp32 results must not be served to predict_image under another backend
+    assert model_predictor.get_cache_stats()["entries"] == 0
@@ -0,0 +1,59 @@
+"""Vectorized preprocessing must match the torchvision training pipeline"""
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.models.preprocessing import Preprocessor, check_parity, reference_transform
+
+ATOL = 1e-5
+
+
+def _noise(mode, size, seed=0):
+    rng = np.random.default_rng(seed)
+    channels = {"RGB": 3, "RGBA": 4, "L": 1}[mode]
+    pixels = rng.integers(0, 256, (size[1], size[0], channels), dtype=np.uint8)
+    return Image.fromarray(pixels.squeeze(-1) if channels == 1 else pixels, mode)
+
+
+IMAGES = {
+    "rgb": _noise("RGB", (512, 384)),
+    "rgba": _noise("RGBA", (300, 300), seed=1),
+    "greyscale": _noise("L", (256, 256), seed=2),
+    "odd_sized": _noise("RGB", (333, 97), seed=3),
+    "already_224": _noise("RGB", (224, 224), seed=4),
+    "upscaled": _noise("RGB", (31, 17), seed=5),
+}
+
+
+@pytest.mark.parametrize("name", list(IMAGES))
+def test_single_image_matches_reference(name):
+    image = IMAGES[name]
+    expected = reference_transform()(image.convert("RGB"))
+    actual = Preprocessor()(image)
+
+    assert actual.shape == expected.shape == (3, 224, 224)
+    assert float((expected - actual).abs().max()) <= ATOL
+
+
+def test_mixed_batch_matches_reference():
+    assert check_parity(list(IMAGES.values()), atol=ATOL) <= ATOL
+
+
+def test_buffer_reuse_does_not_leak_between_batches():
+    preprocessor = Preprocessor()
+    first = preprocessor.batch_numpy(list(IMAGES.values())).copy()
+    preprocessor.batch_numpy([IMAGES["greyscale"]])
+    again = preprocessor.batch_numpy(list(IMAGES.values()))
+
+    np.testing.assert_array_equal(first, again)
+
+
+def test_pixels_then_normalize_matches_batch():
+    # The worker pool path: resized uint8 in the parent, normalised in the worker
+    preprocessor = Preprocessor()
+    pixels = preprocessor.pixels(list(IMAGES.values()))
+
+    assert pixels.dtype == np.uint8 and pixels.shape == (len(IMAGES), 224, 224, 3)
+    np.testing.assert_array_equal(
+        Preprocessor().normalize(pixels), preprocessor.batch_numpy(list(IMAGES.values()))
+    )
@@ -0,0 +1,59 @@
+"""Request validation in the ASGI inference server"""
+import asyncio
+import json
+
+from backend.service import server
+
+
+def _call(method, path, chunks=(b"",), query=b"", headers=()):
+    """Run one request through the ASGI app, returning (status, json body)"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+    received = []
+    sent = []
+
+    async def receive():
+        message = messages.pop(0)
+        received.append(message)
+        return message
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+    }
+    asyncio.run(server.app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"]), len(received)
+
+
+def test_declared_oversized_body_is_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(server, "INFERENCE_SERVICE_MAX_BODY_BYTES", 10)
+    status, payload, received = _call(
+        "POST", "/predict", chunks=(b"x" * 11,), headers=[(b"content-length", b"11")]
+    )
+    assert status == 413
+    assert "exceeds 10 bytes" in payload["error"]
+    assert received == 0
+
+
+def test_streamed_body_over_budget_is_rejected(monkeypatch):
+    monkeypatch.setattr(server, "INFERENCE_SERVICE_MAX_BODY_BYTES", 10)
+    status, _, received = _call("POST", "/predict_batch", chunks=(b"x" * 6,) * 5)
+    assert status == 413
+    assert received == 2
+
+
+def test_explain_rejects_unknown_class_names():
+    status, payload, _ = _call(
+        "POST", "/explain", chunks=(b"not an image",), query=b"classes=nope"
+    )
+    assert status == 400
+    assert payload["error"].startswith("Unknown class 'nope'")
+    assert "is not in list" not in payload["error"]
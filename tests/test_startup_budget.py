@@ -0,0 +1,9 @@
+"""Cold start of app.py must stay light (see benchmarks/startup_budget.py)"""
+from benchmarks.startup_budget import IMPORT_BUDGET_MS, measure_startup
+
+
+def test_cold_start_within_import_budget():
+    report = measure_startup()
+
+    assert report["forbidden"] == [], f"heavy modules imported at startup: {report['forbidden']}"
+    assert report["import_ms"] <= IMPORT_BUDGET_MS, report["heaviest"][:5]
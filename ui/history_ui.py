@@ -0,0 +1,84 @@
+import uuid
+
+import streamlit as st
+import pandas as pd
+
+from backend.config import HISTORY_PAGE_SIZE, HISTORY_SHARED
+from utils.history_store import get_history_store
+from ui.report_ui import render_bulk_export
+
+
+ALL = "All"
+
+
+def history_session_id():
+    """Random id of this browser session, stamped on the records it saves"""
+    return st.session_state.setdefault("history_session_id", uuid.uuid4().hex)
+
+
+def history_scope():
+    """History filters of this session: its own records unless HISTORY_SHARED"""
+    return {} if HISTORY_SHARED else {"session_id": history_session_id()}
+
+
+@st.fragment
+def render_history(key="history"):
+    """
+    Paginated prediction history from the persistent store
+
+    Pages are fetched with a keyset cursor, so every page, not only the
+    first, renders in constant time however large the history grows. The
+    cursors of the pages visited so far are kept in session state for
+    going back. Filtering, paging and export rerun only this fragment.
+
+    Only this session's predictions are listed and exported, unless
+    HISTORY_SHARED opens the whole history of the database.
+    """
+    store = get_history_store()
+    scope = history_scope()
+
+    if store.is_empty(**scope):
+        st.info("No predictions made yet.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        prediction = st.selectbox(
+            "Predicted Class", [ALL] + store.distinct("prediction", **scope), key=f"{key}_class"
+        )
+    with col2:
+        level = st.selectbox(
+            "Confidence Level", [ALL] + store.distinct("confidence_level", **scope), key=f"{key}_level"
+        )
+
+    filters = dict(scope)
+    if prediction != ALL:
+        filters["prediction"] = prediction
+    if level != ALL:
+        filters["confidence_level"] = level
+
+    # Cursor of every page visited so far; a new filter starts over
+    cursors = st.session_state.setdefault(f"{key}_cursors", {})
+    if cursors.get("filters") != filters:
+        cursors.clear()
+        cursors.update(filters=filters, stack=[None])
+    stack = cursors["stack"]
+
+    rows, older = store.page(stack[-1], HISTORY_PAGE_SIZE, **filters)
+    st.dataframe(
+        pd.DataFrame(rows).drop(columns=["probabilities"], errors="ignore"),
+        width="stretch"
+    )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("⬅️ Newer", on_click=stack.pop, disabled=len(stack) == 1, key=f"{key}_newer")
+    with col2:
+        first = (len(stack) - 1) * HISTORY_PAGE_SIZE
+        st.caption(f"Predictions {first + 1}–{first + len(rows)}, newest first"
+                   + (" · all sessions" if HISTORY_SHARED else " · this session"))
+    with col3:
+        st.button("Older ➡️", on_click=stack.append, args=(older,),
+                  disabled=older is None, key=f"{key}_older")
+
+    render_bulk_export(store, scope)
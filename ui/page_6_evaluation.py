@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from backend.config import CLASS_NAMES, EVALUATION_DATA_DIR
+from backend.models.evaluation import load_cached_report, evaluate
+
 def render_evaluation():
     """Page 6: Evaluation & Results – Medical AI Performance"""
 
@@ -19,6 +22,78 @@ def render_evaluation():
     **Disease vs Normal** cases under different conditions.
     """)
 
+    report = load_cached_report()
+
+    if report is None and EVALUATION_DATA_DIR:
+        st.info(
+            f"No evaluation of the current checkpoint on `{EVALUATION_DATA_DIR}` yet."
+        )
+        if st.button("▶️ Run Evaluation"):
+            with st.spinner("Evaluating the model on the labelled folder..."):
+                try:
+                    report = evaluate(EVALUATION_DATA_DIR)
+                except ValueError as exc:
+                    st.error(f"❌ Evaluation failed: {exc}")
+
+    if report is not None:
+        _render_measured_results(report)
+    else:
+        st.caption(
+            "Figures below are the reported results of the training run. "
+            "Set `EVALUATION_DATA_DIR` to a labelled folder (one sub-folder per class) "
+            "to measure the deployed checkpoint instead."
+        )
+        _render_reported_results()
+
+    # ================= FINAL READINESS =================
+    st.markdown("""
+    <div class="card">
+        <h3>✅ Clinical Readiness Assessment</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    readiness_df = _readiness_table(report) if report is not None else pd.DataFrame({
+        "Criterion": [
+            "Accuracy",
+            "Disease Recall",
+            "False Negative Rate",
+            "Inference Speed",
+            "Generalization",
+            "Explainability",
+            "Clinical Validation"
+        ],
+        "Status": [
+            "90% ✅",
+            "92% ✅",
+            "Low (4%) ✅",
+            "<100 ms ✅",
+            "Stable across datasets ✅",
+            "Planned (Grad-CAM) ⏳",
+            "Pending expert review ⏳"
+        ]
+    })
+
+    st.dataframe(readiness_df, width='stretch')
+
+    st.success("""
+    **Final Evaluation Summary**
+
+    ✔ Model demonstrates strong disease detection capability  
+    ✔ Synthetic data significantly improves recall and robustness  
+    ✔ Suitable for **clinical decision support**, not autonomous diagnosis  
+
+    **Key Message:**  
+    The model is reliable enough to assist doctors, not replace them.
+    """)
+
+
+# =========================================================
+# REPORTED RESULTS (training run)
+# =========================================================
+
+def _render_reported_results():
+    """Static figures from the training run, shown when no evaluation data is configured"""
+
     # ================= OVERALL METRICS =================
     st.markdown("""
     <div class="card">
@@ -143,43 +218,155 @@ def render_evaluation():
     In clinical screening, **recall is prioritized over precision**.
     """)
 
-    # ================= FINAL READINESS =================
+
+# =========================================================
+# MEASURED RESULTS (backend.models.evaluation)
+# =========================================================
+
+def _render_measured_results(report):
+    """Metrics measured on the labelled folder with the deployed checkpoint"""
+
     st.markdown("""
     <div class="card">
-        <h3>✅ Clinical Readiness Assessment</h3>
+        <h3>📊 Overall Performance Metrics</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    latency = report["latency"]
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Accuracy", f"{report['accuracy']:.1%}", "Measured")
+
+    with col2:
+        st.metric("Macro F1-Score", f"{report['macro_f1']:.2f}", "Balanced metric")
+
+    with col3:
+        st.metric("Test Samples", f"{report['samples']:,}", "Labelled folder")
+
+    with col4:
+        st.metric(
+            "Inference Time",
+            f"{latency['p50_ms']:.0f} ms",
+            f"Per image ({latency['device'].upper()}, p95 {latency['p95_ms']:.0f} ms)",
+            delta_color="off"
+        )
+
+    st.caption(
+        f"Evaluated {report['evaluated_at']} on `{report['data_dir']}` – "
+        f"checkpoint `{report['checkpoint_sha256'][:12]}` ({report['inference_backend']}), "
+        f"{report['throughput_per_sec']:.1f} images/sec batched"
+    )
+
+    # ---------------- CONFUSION MATRICES ----------------
+    st.markdown("""
+    <div class="card">
+        <h3>🔄 Confusion Matrix</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    binary = report["disease_vs_normal"]
+    (tn, fp), (fn, tp) = binary["confusion_matrix"]
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.dataframe(
+            pd.DataFrame(
+                binary["confusion_matrix"],
+                columns=["Predicted Normal", "Predicted Disease"],
+                index=["Actual Normal", "Actual Disease"]
+            ),
+            width='stretch'
+        )
+
+    with col2:
+        st.markdown(f"""
+        **Disease vs Normal:**
+        - **True Positives ({tp})**: Disease correctly detected
+        - **False Negatives ({fn})** ⚠️: Disease missed (critical risk)
+        - **False Positives ({fp})**: Normal flagged as disease
+        - **True Negatives ({tn})**: Normal correctly identified
+        """)
+
+    st.markdown("**All classes** (rows: actual, columns: predicted)")
+    st.dataframe(
+        pd.DataFrame(report["confusion_matrix"], columns=CLASS_NAMES, index=CLASS_NAMES),
+        width='stretch'
+    )
+
+    st.dataframe(
+        pd.DataFrame(report["per_class"]).set_index("class").round(3),
+        width='stretch'
+    )
+
+    # ---------------- ROC / PR ----------------
+    st.markdown("""
+    <div class="card">
+        <h3>📈 ROC Curve – Sensitivity vs Specificity</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    grid = report["curve_grid"]
+    roc_curves = dict(report["roc"])
+    if binary["roc"] is not None:
+        roc_curves["Disease vs Normal"] = binary["roc"]
+    st.line_chart(pd.DataFrame(roc_curves, index=pd.Index(grid, name="False Positive Rate")))
+
+    if binary["auc"] is not None:
+        st.markdown(f"**Disease vs Normal ROC-AUC = {binary['auc']:.3f}**")
+
+    st.markdown("""
+    <div class="card">
+        <h3>📉 Precision–Recall Curve (Rare Disease Focus)</h3>
     </div>
     """, unsafe_allow_html=True)
 
-    readiness_df = pd.DataFrame({
+    pr_curves = dict(report["pr"])
+    if binary["pr"] is not None:
+        pr_curves["Disease vs Normal"] = binary["pr"]
+    st.line_chart(pd.DataFrame(pr_curves, index=pd.Index(grid, name="Recall")))
+
+    if binary["average_precision"] is not None:
+        st.markdown(f"**Disease vs Normal average precision = {binary['average_precision']:.3f}**")
+
+    # ---------------- THRESHOLDS ----------------
+    st.markdown("""
+    <div class="card">
+        <h3>⚖️ Threshold Sensitivity Analysis</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    threshold_df = pd.DataFrame(binary["thresholds"]).rename(columns={
+        "threshold": "Confidence Threshold",
+        "recall": "Recall (Disease)",
+        "precision": "Precision (Disease)",
+    })
+    st.line_chart(threshold_df.set_index("Confidence Threshold"))
+
+
+def _readiness_table(report):
+    """Clinical readiness criteria filled in from a measured report"""
+    (tn, fp), (fn, tp) = report["disease_vs_normal"]["confusion_matrix"]
+    recall = tp / max(tp + fn, 1)
+    fnr = fn / max(tp + fn, 1)
+    latency = report["latency"]["p50_ms"]
+
+    return pd.DataFrame({
         "Criterion": [
             "Accuracy",
             "Disease Recall",
             "False Negative Rate",
             "Inference Speed",
-            "Generalization",
             "Explainability",
             "Clinical Validation"
         ],
         "Status": [
-            "90% ✅",
-            "92% ✅",
-            "Low (4%) ✅",
-            "<100 ms ✅",
-            "Stable across datasets ✅",
-            "Planned (Grad-CAM) ⏳",
+            f"{report['accuracy']:.0%} {'✅' if report['accuracy'] >= 0.9 else '⚠️'}",
+            f"{recall:.0%} {'✅' if recall >= 0.9 else '⚠️'}",
+            f"{fnr:.0%} {'✅' if fnr <= 0.05 else '⚠️'}",
+            f"{latency:.0f} ms {'✅' if latency < 100 else '⚠️'}",
+            "Grad-CAM / Grad-CAM++ / Score-CAM ✅",
             "Pending expert review ⏳"
         ]
     })
-
-    st.dataframe(readiness_df, width='stretch')
-
-    st.success("""
-    **Final Evaluation Summary**
-
-    ✔ Model demonstrates strong disease detection capability  
-    ✔ Synthetic data significantly improves recall and robustness  
-    ✔ Suitable for **clinical decision support**, not autonomous diagnosis  
-
-    **Key Message:**  
-    The model is reliable enough to assist doctors, not replace them.
-    """)
@@ -3,10 +3,26 @@ import pandas as pd
 from PIL import Image
 import datetime
 
-from backend.models.model_predictor import predict_image
+from backend import tracing
+from backend.config import CLASS_NAMES, EXPLAINER_BUDGETS_MS
+from backend.service.client import (
+    predict_image,
+    predict_batch,
+    predict_and_explain_batch,
+    get_cache_stats,
+)
 from utils.confidence_utils import confidence_label, get_confidence_message
-from utils.image_utils import generate_mock_gradcam
-from utils.pdf_generator import generate_pdf_report
+from ui.report_ui import render_report_download
+from ui.history_ui import history_session_id, render_history
+from utils.history_store import get_history_store
+
+
+# Explainability methods offered to reviewers (backend.gradcam.explainers)
+EXPLAINER_METHODS = {
+    "gradcam": "Grad-CAM",
+    "gradcam++": "Grad-CAM++",
+    "scorecam": "Score-CAM",
+}
 
 
 # =========================================================
@@ -15,11 +31,11 @@ from utils.pdf_generator import generate_pdf_report
 
 def render_prediction():
     """Live Prediction Page – REAL MODEL INFERENCE (Colab-Aligned)"""
+    with tracing.request("render_prediction"):
+        _render_prediction()
 
-    # ---------------- STATE ----------------
-    if "history" not in st.session_state:
-        st.session_state.history = []
 
+def _render_prediction():
     st.markdown("""
     <div class="card">
         <h2>🖼️ Live Prediction – Clinical Decision Support</h2>
@@ -31,193 +47,86 @@ def render_prediction():
     Predictions and confidence values are produced directly by the model.
     """)
 
-    uploaded_file = st.file_uploader(
-        "Upload CT / MRI / X-ray Image",
-        type=["png", "jpg", "jpeg"]
+    uploaded_files = st.file_uploader(
+        "Upload CT / MRI / X-ray Image(s)",
+        type=["png", "jpg", "jpeg"],
+        accept_multiple_files=True
     )
 
-    if uploaded_file:
-        image = Image.open(uploaded_file).convert("RGB")
+    if uploaded_files:
+        with tracing.span("decode"):
+            images = [Image.open(f).convert("RGB") for f in uploaded_files]
 
         col1, col2 = st.columns([1, 1])
 
         # ---------------- IMAGE PREVIEW ----------------
         with col1:
-            st.image(
-                image,
-                caption="Uploaded Medical Image",
-                width=320
-            )
+            if len(images) == 1:
+                st.image(
+                    images[0],
+                    caption="Uploaded Medical Image",
+                    width=320
+                )
+            else:
+                st.image(
+                    images,
+                    caption=[f.name for f in uploaded_files],
+                    width=100
+                )
 
         with col2:
-            st.markdown("""
-            **Image Ready for Inference**
+            st.markdown(f"""
+            **{len(images)} Image(s) Ready for Inference**
             - Input Size: 224 × 224
             - Color Mode: RGB
             - Model: ResNet-18 (5-Class CNN)
             """)
+            explainer = st.selectbox(
+                "Explainability Method",
+                list(EXPLAINER_METHODS),
+                format_func=lambda name: (
+                    f"{EXPLAINER_METHODS[name]} – budget {EXPLAINER_BUDGETS_MS[name]} ms"
+                ),
+            )
+            compare_classes = st.checkbox("Compare explanations across all classes")
             run = st.button("🚀 Run Prediction")
 
         # ---------------- RUN INFERENCE ----------------
         if run:
             with st.spinner("Running AI inference..."):
-                result = predict_image(image)
-
-            predicted_class = result["prediction"]
-            confidence = result["confidence"]        # 0–1
-            probabilities = result["probabilities"]
-            conf_level = confidence_label(confidence)
-
-            # Save history
-            record = {
-                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "image_name": uploaded_file.name,
-                "prediction": predicted_class,
-                "confidence": confidence,
-                "confidence_level": conf_level,
-            }
-            st.session_state.history.append(record)
-
-            # ---------------- RESULTS ----------------
-            st.markdown("""
-            <div class="card">
-                <h3>📊 Prediction Result</h3>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # Custom styling for results
-            col_res1, col_res2, col_res3 = st.columns([1, 1, 1])
-            
-            with col_res1:
-                st.markdown(f"""
-                <div style="background: linear-gradient(135deg, rgba(0, 153, 255, 0.1), rgba(0, 217, 255, 0.1)); border-left: 4px solid #0099ff; border-radius: 12px; padding: 16px; text-align: center;">
-                    <div style="color: #64748b; font-size: 12px; margin-bottom: 8px;">Predicted Disease</div>
-                    <div style="color: #0099ff; font-size: 24px; font-weight: bold;">{predicted_class}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col_res2:
-                st.markdown(f"""
-                <div style="background: linear-gradient(135deg, rgba(34, 197, 94, 0.1), rgba(34, 197, 94, 0.05)); border-left: 4px solid #22c55e; border-radius: 12px; padding: 16px; text-align: center;">
-                    <div style="color: #64748b; font-size: 12px; margin-bottom: 8px;">Confidence</div>
-                    <div style="color: #22c55e; font-size: 24px; font-weight: bold;">{confidence:.2%}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col_res3:
-                st.markdown(f"""
-                <div style="background: linear-gradient(135deg, rgba(168, 85, 247, 0.1), rgba(168, 85, 247, 0.05)); border-left: 4px solid #a855f7; border-radius: 12px; padding: 16px; text-align: center;">
-                    <div style="color: #64748b; font-size: 12px; margin-bottom: 8px;">Confidence Level</div>
-                    <div style="color: #a855f7; font-size: 24px; font-weight: bold;">{conf_level}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("")
-            
-            # Probability visualization with smaller chart
-            prob_df = pd.DataFrame({
-                "Disease Class": list(probabilities.keys()),
-                "Confidence Score": list(probabilities.values())
-            })
-            
-            # Create a more compact chart
-            st.markdown("**Confidence Scores by Disease Class**")
-            
-            chart_col1, chart_col2 = st.columns([2, 1])
-            with chart_col1:
-                st.bar_chart(
-                    prob_df.set_index("Disease Class"),
-                    height=280,
-                    use_container_width=True
-                )
-            
-            with chart_col2:
-                st.markdown("**Scores**")
-                for disease, score in probabilities.items():
-                    st.markdown(f"• {disease}: **{score:.2%}**")
-
-            # ---------------- GRAD-CAM (Mock) ----------------
-            st.markdown("""
-            <div class="card">
-                <h3>🔥 Grad-CAM Visualization</h3>
-            </div>
-            """, unsafe_allow_html=True)
-
-            gradcam_img = generate_mock_gradcam(image)
-
-            g1, g2 = st.columns(2)
-            with g1:
-                st.image(image, caption="Original Image", width=220)
-            with g2:
-                st.image(gradcam_img, caption="Grad-CAM Overlay", width=220)
-
-            # ---------------- CLINICAL INTERPRETATION ----------------
-            if conf_level == "High":
-                st.success(get_confidence_message(conf_level))
-            elif conf_level == "Moderate":
-                st.warning(get_confidence_message(conf_level))
-            else:
-                st.error(get_confidence_message(conf_level))
-
-            # ---------------- PDF REPORT ----------------
-            st.markdown("""
-            <div class="card">
-                <h3>📄 Generate Report</h3>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # Generate PDF buffer (assumed function)
-            pdf_buffer = generate_pdf_report(record)
-
-            # Custom button styling (NEW COLOR THEME: Purple → Pink Gradient)
-            st.markdown("""
-            <style>
-                .download-btn {
-                    display: flex;
-                    justify-content: center;
-                    margin: 24px 0;
-                }
-
-                /* Target Streamlit download button */
-                div.stDownloadButton > button {
-                    background: linear-gradient(135deg, #7b2ff7, #f107a3) !important;
-                    color: #ffffff !important;
-                    border: none !important;
-                    padding: 14px 36px !important;
-                    font-size: 16px !important;
-                    font-weight: 600 !important;
-                    border-radius: 10px !important;
-                    cursor: pointer !important;
-                    transition: all 0.35s ease !important;
-                    box-shadow: 0 6px 20px rgba(123, 47, 247, 0.45) !important;
-                }
-
-                div.stDownloadButton > button:hover {
-                    background: linear-gradient(135deg, #5f1eea, #c8007a) !important;
-                    box-shadow: 0 10px 30px rgba(193, 0, 122, 0.55) !important;
-                    transform: translateY(-4px) scale(1.02) !important;
-                }
-
-                div.stDownloadButton > button:active {
-                    transform: translateY(0px) scale(0.98) !important;
-                    box-shadow: 0 4px 12px rgba(123, 47, 247, 0.35) !important;
-                }
-            </style>
-            <div class="download-btn">
-            """, unsafe_allow_html=True)
-
-            # Centered button using columns
-            col1, col2, col3 = st.columns([1, 1, 1])
-            with col2:
-                st.download_button(
-                    label="📥 Download PDF Report",
-                    data=pdf_buffer,
-                    file_name="AI_Prediction_Report.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
+                # The explainer's forward pass also yields the predictions;
+                # comparing classes explains all of them in that same pass
+                try:
+                    outputs = predict_and_explain_batch(
+                        images, explainer, CLASS_NAMES if compare_classes else None
+                    )
+                except Exception:
+                    if len(images) == 1:
+                        results = [predict_image(images[0])]
+                    else:
+                        results = predict_batch(images)
+                    outputs = [(result, {}, None) for result in results]
+
+            # One upload run = one study in the history
+            study_id = datetime.datetime.now().strftime("study-%Y%m%d-%H%M%S")
+
+            for idx, (uploaded_file, image, (result, overlays, explain_info)) in enumerate(
+                zip(uploaded_files, images, outputs)
+            ):
+                if len(images) > 1:
+                    st.markdown(f"#### 🩻 {uploaded_file.name}")
+                _render_result(
+                    image, uploaded_file.name, result, overlays, explain_info, idx,
+                    explainer, study_id, compare_classes,
                 )
 
-            st.markdown("</div>", unsafe_allow_html=True)
+            cache_stats = get_cache_stats()
+            st.caption(
+                f"Prediction cache: {cache_stats['hits']} hits / "
+                f"{cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate, "
+                f"{cache_stats['entries']} entries)"
+            )
 
     # ---------------- HISTORY ----------------
     st.markdown("""
@@ -226,13 +135,7 @@ def render_prediction():
     </div>
     """, unsafe_allow_html=True)
 
-    if st.session_state.history:
-        st.dataframe(
-            pd.DataFrame(st.session_state.history),
-            use_container_width=True
-        )
-    else:
-        st.info("No predictions made yet.")
+    render_history()
 
     # ---------------- DISCLAIMER ----------------
     st.info("""
@@ -240,3 +143,196 @@ def render_prediction():
     This AI system is a clinical decision-support tool.  
     Final diagnosis must always be confirmed by a qualified medical professional.
     """)
+
+
+# =========================================================
+# SINGLE RESULT
+# =========================================================
+
+def _render_result(image, image_name, result, overlays, explain_info, idx=0,
+                   explainer="gradcam", study_id=None, compare_classes=False):
+    """
+    Render the result, CAM overlays and report for one predicted image
+
+    `overlays` maps class names to overlays (empty if the explanation
+    failed); `explain_info` is the explainer's latency info or None.
+    """
+
+    predicted_class = result["prediction"]
+    confidence = result["confidence"]        # 0–1
+    probabilities = result["probabilities"]
+    conf_level = confidence_label(confidence)
+
+    # Save history
+    record = {
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "image_name": image_name,
+        "prediction": predicted_class,
+        "confidence": confidence,
+        "confidence_level": conf_level,
+        "study_id": study_id,
+        "probabilities": probabilities,
+        "session_id": history_session_id(),
+    }
+    get_history_store().append(record)
+
+    # ---------------- RESULTS ----------------
+    st.markdown("""
+    <div class="card">
+        <h3>📊 Prediction Result</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Custom styling for results
+    col_res1, col_res2, col_res3 = st.columns([1, 1, 1])
+    
+    with col_res1:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, rgba(0, 153, 255, 0.1), rgba(0, 217, 255, 0.1)); border-left: 4px solid #0099ff; border-radius: 12px; padding: 16px; text-align: center;">
+            <div style="color: #64748b; font-size: 12px; margin-bottom: 8px;">Predicted Disease</div>
+            <div style="color: #0099ff; font-size: 24px; font-weight: bold;">{predicted_class}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col_res2:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, rgba(34, 197, 94, 0.1), rgba(34, 197, 94, 0.05)); border-left: 4px solid #22c55e; border-radius: 12px; padding: 16px; text-align: center;">
+            <div style="color: #64748b; font-size: 12px; margin-bottom: 8px;">Confidence</div>
+            <div style="color: #22c55e; font-size: 24px; font-weight: bold;">{confidence:.2%}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col_res3:
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, rgba(168, 85, 247, 0.1), rgba(168, 85, 247, 0.05)); border-left: 4px solid #a855f7; border-radius: 12px; padding: 16px; text-align: center;">
+            <div style="color: #64748b; font-size: 12px; margin-bottom: 8px;">Confidence Level</div>
+            <div style="color: #a855f7; font-size: 24px; font-weight: bold;">{conf_level}</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("")
+    
+    # Probability visualization with smaller chart
+    prob_df = pd.DataFrame({
+        "Disease Class": list(probabilities.keys()),
+        "Confidence Score": list(probabilities.values())
+    })
+    
+    # Create a more compact chart
+    st.markdown("**Confidence Scores by Disease Class**")
+    
+    chart_col1, chart_col2 = st.columns([2, 1])
+    with chart_col1:
+        st.bar_chart(
+            prob_df.set_index("Disease Class"),
+            height=280,
+            use_container_width=True
+        )
+    
+    with chart_col2:
+        st.markdown("**Scores**")
+        for disease, score in probabilities.items():
+            st.markdown(f"• {disease}: **{score:.2%}**")
+
+    # ---------------- GRAD-CAM ----------------
+    st.markdown(f"""
+    <div class="card">
+        <h3>🔥 {EXPLAINER_METHODS[explainer]} Visualization</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    gradcam_img = overlays.get(predicted_class)
+
+    g1, g2 = st.columns(2)
+    with g1:
+        st.image(image, caption="Original Image", width=220)
+    with g2:
+        if gradcam_img is not None:
+            st.image(gradcam_img, caption="Class Activation Overlay", width=220)
+        else:
+            st.info("Explanation could not be generated.")
+
+    if explain_info is not None:
+        st.caption(
+            "Served from cache" if explain_info["cached"] else
+            f"{explain_info['latency_ms']:.0f} ms of "
+            f"{explain_info['budget_ms']} ms budget"
+            + ("" if explain_info["within_budget"] else " ⚠️ over budget")
+            + ("" if explain_info["complete"] else " ⚠️ partial, budget reached")
+        )
+
+    if compare_classes:
+        # Every class was explained in the prediction's forward/backward
+        with st.expander("🔬 Compare explanations across all classes", expanded=True):
+            if len(overlays) > 1:
+                cols = st.columns(len(overlays))
+                for col, (class_name, overlay) in zip(cols, overlays.items()):
+                    with col:
+                        st.image(overlay, caption=class_name, width="stretch")
+            else:
+                st.info("Explanations could not be generated.")
+
+    # ---------------- CLINICAL INTERPRETATION ----------------
+    if conf_level == "High":
+        st.success(get_confidence_message(conf_level))
+    elif conf_level == "Moderate":
+        st.warning(get_confidence_message(conf_level))
+    else:
+        st.error(get_confidence_message(conf_level))
+
+    # ---------------- PDF REPORT ----------------
+    st.markdown("""
+    <div class="card">
+        <h3>📄 Generate Report</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Custom button styling (NEW COLOR THEME: Purple → Pink Gradient)
+    st.markdown("""
+    <style>
+        .download-btn {
+            display: flex;
+            justify-content: center;
+            margin: 24px 0;
+        }
+
+        /* Target Streamlit download button */
+        div.stDownloadButton > button {
+            background: linear-gradient(135deg, #7b2ff7, #f107a3) !important;
+            color: #ffffff !important;
+            border: none !important;
+            padding: 14px 36px !important;
+            font-size: 16px !important;
+            font-weight: 600 !important;
+            border-radius: 10px !important;
+            cursor: pointer !important;
+            transition: all 0.35s ease !important;
+            box-shadow: 0 6px 20px rgba(123, 47, 247, 0.45) !important;
+        }
+
+        div.stDownloadButton > button:hover {
+            background: linear-gradient(135deg, #5f1eea, #c8007a) !important;
+            box-shadow: 0 10px 30px rgba(193, 0, 122, 0.55) !important;
+            transform: translateY(-4px) scale(1.02) !important;
+        }
+
+        div.stDownloadButton > button:active {
+            transform: translateY(0px) scale(0.98) !important;
+            box-shadow: 0 4px 12px rgba(123, 47, 247, 0.35) !important;
+        }
+    </style>
+    <div class="download-btn">
+    """, unsafe_allow_html=True)
+
+    # Centered button using columns
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col2:
+        # Rendered lazily on a background thread
+        render_report_download(
+            record,
+            probabilities=probabilities,
+            gradcam_image=gradcam_img,
+            key=f"pdf_report_{idx}"
+        )
+
+    st.markdown("</div>", unsafe_allow_html=True)
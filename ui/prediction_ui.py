@@ -3,11 +3,12 @@ import pandas as pd
 from PIL import Image
 import datetime
 
-from backend.inference import predict_image, _load_model, _get_transform, _get_device
-from backend.gradcam.gradcam import generate_real_gradcam
+from backend.service.client import predict_image, predict_and_explain, explain_all_classes
 
 from utils.confidence_utils import confidence_label, get_confidence_message
-from utils.pdf_generator import generate_pdf_report
+from ui.report_ui import render_report_download
+from ui.history_ui import history_session_id, render_history
+from utils.history_store import get_history_store
 
 
 # =========================================================
@@ -17,10 +18,6 @@ from utils.pdf_generator import generate_pdf_report
 def render_prediction():
     """Live Prediction Page – REAL MODEL INFERENCE + REAL Grad-CAM"""
 
-    # ---------------- STATE ----------------
-    if "history" not in st.session_state:
-        st.session_state.history = []
-
     st.markdown("""
     <div class="card">
         <h2>🖼️ Live Prediction – Clinical Decision Support</h2>
@@ -57,12 +54,17 @@ def render_prediction():
             - Color Mode: RGB
             - Model: ResNet-18 (5-Class CNN)
             """)
+            compare_classes = st.checkbox("Compare Grad-CAM across all classes")
             run = st.button("🚀 Run Prediction")
 
         # ---------------- RUN INFERENCE ----------------
         if run:
+            # One forward pass yields both the prediction and the Grad-CAM
             with st.spinner("Running AI inference..."):
-                result = predict_image(image)
+                try:
+                    result, gradcam_img = predict_and_explain(image)
+                except Exception:
+                    result, gradcam_img = predict_image(image), None
 
             predicted_class = result["prediction"]
             confidence = result["confidence"]        # 0–1
@@ -70,14 +72,18 @@ def render_prediction():
             conf_level = confidence_label(confidence)
 
             # Save history
+            now = datetime.datetime.now()
             record = {
-                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
                 "image_name": uploaded_file.name,
                 "prediction": predicted_class,
                 "confidence": confidence,
                 "confidence_level": conf_level,
+                "study_id": now.strftime("study-%Y%m%d-%H%M%S"),
+                "probabilities": probabilities,
+                "session_id": history_session_id(),
             }
-            st.session_state.history.append(record)
+            get_history_store().append(record)
 
             # ---------------- RESULTS ----------------
             st.markdown("""
@@ -107,24 +113,6 @@ def render_prediction():
             </div>
             """, unsafe_allow_html=True)
 
-            gradcam_img = None
-            try:
-                model = _load_model()
-                transform = _get_transform()
-                device = _get_device()
-
-                class_idx = list(probabilities.keys()).index(predicted_class)
-
-                gradcam_img = generate_real_gradcam(
-                    model=model,
-                    image_pil=image,
-                    transform=transform,
-                    device=device,
-                    class_idx=class_idx
-                )
-            except Exception:
-                gradcam_img = None
-
             g1, g2 = st.columns(2)
             with g1:
                 st.image(image, caption="Original Image", width=280)
@@ -134,6 +122,21 @@ def render_prediction():
                 else:
                     st.info("Grad-CAM could not be generated.")
 
+            if compare_classes:
+                with st.expander("🔬 Grad-CAM across all classes", expanded=True):
+                    try:
+                        class_overlays = explain_all_classes(image)
+                    except Exception:
+                        class_overlays = {}
+
+                    if class_overlays:
+                        cols = st.columns(len(class_overlays))
+                        for col, (class_name, overlay) in zip(cols, class_overlays.items()):
+                            with col:
+                                st.image(overlay, caption=class_name, use_container_width=True)
+                    else:
+                        st.info("Grad-CAM could not be generated.")
+
             # ---------------- CLINICAL INTERPRETATION ----------------
             if conf_level == "High":
                 st.success(get_confidence_message(conf_level))
@@ -143,12 +146,10 @@ def render_prediction():
                 st.error(get_confidence_message(conf_level))
 
             # ---------------- PDF REPORT ----------------
-            pdf_buffer = generate_pdf_report(record)
-            st.download_button(
-                label="📄 Download PDF Report",
-                data=pdf_buffer,
-                file_name="AI_Prediction_Report.pdf",
-                mime="application/pdf"
+            render_report_download(
+                record,
+                probabilities=probabilities,
+                gradcam_image=gradcam_img
             )
 
     # ---------------- HISTORY ----------------
@@ -158,13 +159,7 @@ def render_prediction():
     </div>
     """, unsafe_allow_html=True)
 
-    if st.session_state.history:
-        st.dataframe(
-            pd.DataFrame(st.session_state.history),
-            use_container_width=True
-        )
-    else:
-        st.info("No predictions made yet.")
+    render_history()
 
     # ---------------- DISCLAIMER ----------------
     st.info("""
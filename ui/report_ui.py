@@ -0,0 +1,108 @@
+import concurrent.futures
+import functools
+
+import streamlit as st
+from streamlit.errors import StreamlitInvalidLayoutContextError
+
+# reportlab (utils.pdf_generator / utils.bulk_export) is imported only when
+# a report is actually requested
+
+
+# How long a pending report waits for its background render before the
+# fragment reruns to check again
+REPORT_POLL_SECONDS = 0.5
+
+
+@st.fragment
+def render_report_download(record, probabilities=None, gradcam_image=None, key="pdf_report"):
+    """
+    On-demand PDF report for one prediction
+
+    Nothing is rendered until the user asks for the report; rendering then
+    runs on the background pool. While it is pending the fragment waits up
+    to REPORT_POLL_SECONDS at a time and reruns itself, so the status stays
+    live and polling ends as soon as the download is shown. As a fragment,
+    its buttons only rerun this section, so the prediction shown above
+    stays on screen.
+    """
+    record_id = (record["timestamp"], record["image_name"])
+    pending = st.session_state.get(key)
+
+    if pending is None or pending[0] != record_id:
+        if not st.button("📄 Prepare PDF Report", key=f"{key}_prepare", width="stretch"):
+            return
+        from utils.pdf_generator import submit_pdf_report
+        st.session_state[key] = (record_id, submit_pdf_report(record, probabilities, gradcam_image))
+
+    future = st.session_state[key][1]
+    if not future.done():
+        st.caption("⏳ Rendering PDF report...")
+        concurrent.futures.wait([future], timeout=REPORT_POLL_SECONDS)
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitInvalidLayoutContextError:
+            # Reached in a full app run, where only the whole page could
+            # rerun: wait for the render instead
+            concurrent.futures.wait([future])
+
+    if future.exception() is not None:
+        st.error(f"❌ Report could not be generated: {future.exception()}")
+        return
+
+    st.download_button(
+        label="📥 Download PDF Report",
+        data=future.result().getvalue,
+        file_name="AI_Prediction_Report.pdf",
+        mime="application/pdf",
+        width="stretch",
+        key=f"{key}_download",
+        on_click="ignore"
+    )
+
+
+@st.fragment
+def render_bulk_export(store, scope=None, key="bulk_export"):
+    """
+    Export the whole history, or one study, as a multi-page PDF or a ZIP
+    of per-image PDFs with a CSV of class probabilities
+
+    Args:
+        store (HistoryStore): Persistent prediction history
+        scope (dict): Filters limiting the export (e.g. to one session)
+    """
+    scope = scope or {}
+    with st.expander("📦 Bulk Export"):
+        col1, col2 = st.columns(2)
+        with col1:
+            study = st.selectbox(
+                "Study", ["All history"] + store.distinct("study_id", **scope)[::-1], key=f"{key}_study"
+            )
+        with col2:
+            fmt = st.radio("Format", ["ZIP (PDFs + CSV)", "Multi-page PDF"], key=f"{key}_format")
+
+        filters = dict(scope) if study == "All history" else dict(scope, study_id=study)
+        if fmt.startswith("ZIP"):
+            file_name, mime = "AI_Prediction_Reports.zip", "application/zip"
+        else:
+            file_name, mime = "AI_Prediction_Reports.pdf", "application/pdf"
+
+        # Rendered only when the button is clicked; Streamlit then reads the
+        # spooled export once into its download store and it is closed
+        st.download_button(
+            label=f"📥 Download {file_name}",
+            data=functools.partial(_render_bulk_export, store, filters, fmt.startswith("ZIP")),
+            file_name=file_name,
+            mime=mime,
+            width="stretch",
+            key=f"{key}_download",
+            on_click="ignore"
+        )
+
+
+def _render_bulk_export(store, filters, as_zip):
+    from utils.bulk_export import export_history_pdf, export_history_zip
+
+    records = store.iter_records(**filters)
+    export = export_history_zip(records) if as_zip else export_history_pdf(records)
+    with export:
+        return export.read()
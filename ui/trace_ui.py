@@ -0,0 +1,75 @@
+import json
+
+import streamlit as st
+
+from backend import tracing
+
+
+def _toggle_tracing():
+    # Runs before the script, so the page rendered on this rerun is traced
+    tracing.enable(st.session_state.trace_enabled)
+
+
+def render_trace_panel():
+    """
+    Sidebar debug panel: per-stage breakdown of the last prediction
+    request, stage histograms and a Chrome trace download
+    """
+    with st.sidebar.expander("🐞 Pipeline Tracing"):
+        st.checkbox(
+            "Trace requests (all sessions)",
+            value=tracing.is_enabled(),
+            key="trace_enabled",
+            on_change=_toggle_tracing
+        )
+        if not tracing.is_enabled():
+            st.caption("Tracing is off – instrumented stages cost nothing.")
+            return
+
+        import pandas as pd
+
+        last = tracing.last_request("render_prediction")
+        if last is None:
+            st.caption("Run a prediction to see its breakdown.")
+        else:
+            st.markdown(f"**Last prediction request: {last['total_ms']:.0f} ms**")
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Stage": "  " * s["depth"] + s["name"],
+                        "Start (ms)": round(s["offset_ms"], 1),
+                        "Duration (ms)": round(s["duration_ms"], 1),
+                    }
+                    for s in last["spans"]
+                ]),
+                hide_index=True,
+                width="stretch"
+            )
+
+        stats = tracing.histograms()
+        if stats:
+            st.markdown("**All requests (per stage)**")
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Stage": name,
+                        "Count": h["count"],
+                        "Mean (ms)": round(h["mean_ms"], 1),
+                        "p50 ≤ (ms)": h["p50_ms"],
+                        "p95 ≤ (ms)": h["p95_ms"],
+                        "Max (ms)": round(h["max_ms"], 1),
+                    }
+                    for name, h in sorted(stats.items())
+                ]),
+                hide_index=True,
+                width="stretch"
+            )
+
+        st.download_button(
+            "📥 Chrome Trace (JSON)",
+            data=json.dumps(tracing.chrome_trace()),
+            file_name="prediction_trace.json",
+            mime="application/json",
+            on_click="ignore",
+            width="stretch"
+        )
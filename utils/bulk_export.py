@@ -0,0 +1,122 @@
+"""
+Bulk export of prediction history (multi-page PDF or ZIP of PDFs + CSV)
+"""
+import csv
+import io
+import itertools
+import re
+import shutil
+import zipfile
+from tempfile import SpooledTemporaryFile
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Frame
+from reportlab.platypus.doctemplate import LayoutError
+
+from utils.pdf_generator import generate_pdf_report, report_flowables
+
+# Exports stay in memory up to this size, then spill to a temporary file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+CSV_FIELDS = ["timestamp", "study_id", "image_name", "prediction", "confidence", "confidence_level"]
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name or "image")
+
+
+def _csv_row(record, class_names):
+    row = [record.get(field, "") for field in CSV_FIELDS]
+    probabilities = record.get("probabilities") or {}
+    return row + [probabilities.get(name, "") for name in class_names]
+
+
+def export_history_zip(records):
+    """
+    ZIP with one PDF report per record plus a CSV of all probabilities
+
+    Each PDF is rendered, written into the archive and released before the
+    next one, so memory holds at most one report at a time.
+
+    Args:
+        records (iterable[dict]): History records (see `generate_pdf_report`),
+            optionally with "probabilities" and "study_id"; consumed lazily
+
+    Returns:
+        SpooledTemporaryFile: ZIP archive positioned at the start
+    """
+    records = iter(records)
+    first = next(records, None)
+    records = itertools.chain([first] if first else [], records)
+    # Probability columns follow the first record (all share the model's classes)
+    class_names = list((first or {}).get("probabilities") or {})
+
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    csv_buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+", newline="")
+    writer = csv.writer(csv_buffer)
+    writer.writerow(CSV_FIELDS + class_names)
+
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for i, record in enumerate(records, start=1):
+            pdf = generate_pdf_report(record, record.get("probabilities"))
+            archive.writestr(f"reports/{i:04d}_{_safe_name(record.get('image_name'))}.pdf", pdf.getvalue())
+            writer.writerow(_csv_row(record, class_names))
+
+        csv_buffer.seek(0)
+        with archive.open("predictions.csv", "w") as entry:
+            text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+            shutil.copyfileobj(csv_buffer, text)
+            text.flush()
+            text.detach()
+
+    csv_buffer.close()
+    output.seek(0)
+    return output
+
+
+def _draw_report(canv, flowables):
+    """
+    Lay one report out from a fresh page onwards, in the same single frame
+    (1 inch margins) as `SimpleDocTemplate`, splitting what does not fit
+    """
+    width, height = A4
+    while flowables:
+        frame = Frame(inch, inch, width - 2 * inch, height - 2 * inch)
+        first, split = flowables[0], False
+        while flowables:
+            if frame.add(flowables[0], canv):
+                del flowables[0]
+                continue
+            parts = [] if split else frame.split(flowables[0], canv)
+            if not parts:
+                break
+            flowables[:1] = parts
+            split = True
+        canv.showPage()
+        if flowables and flowables[0] is first:
+            raise LayoutError(f"{first.__class__.__name__} does not fit on an empty page")
+
+
+def export_history_pdf(records):
+    """
+    One multi-page PDF with a page per record
+
+    Each record's flowables are built, drawn and released before the next
+    record's, so only one report's flowables are held; the canvas keeps
+    each page's compiled content (a few KB) until the file is written.
+
+    Args:
+        records (iterable[dict]): History records; consumed lazily
+
+    Returns:
+        SpooledTemporaryFile: PDF positioned at the start
+    """
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    canv = Canvas(output, pagesize=A4)
+    for record in records:
+        _draw_report(canv, report_flowables(record, record.get("probabilities")))
+    canv.save()
+    output.seek(0)
+    return output
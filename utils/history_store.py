@@ -0,0 +1,199 @@
+"""
+Persistent prediction history (SQLite, WAL mode)
+
+Records are append-only; reads are paginated with a keyset cursor on
+(timestamp, id) and filtered on indexed columns, so rendering a page
+costs the same at 100 or 100,000 records.
+
+Every record carries the id of the session that made it, and the UI
+reads with a `session_id` filter, so a session only sees its own
+predictions. Only with HISTORY_SHARED does it browse the whole table.
+Records from before sessions were recorded have no session id and are
+therefore only visible in shared mode.
+"""
+import functools
+import json
+import os
+import sqlite3
+import threading
+
+from backend.config import HISTORY_DB_PATH
+
+_TABLE = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id               INTEGER PRIMARY KEY,
+    session_id       TEXT,
+    timestamp        TEXT NOT NULL,
+    study_id         TEXT,
+    image_name       TEXT,
+    prediction       TEXT NOT NULL,
+    confidence       REAL NOT NULL,
+    confidence_level TEXT NOT NULL,
+    probabilities    TEXT
+)
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_predictions_session ON predictions (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_prediction ON predictions (prediction, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_level ON predictions (confidence_level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_class_level
+    ON predictions (prediction, confidence_level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_study ON predictions (study_id);
+"""
+
+COLUMNS = [
+    "timestamp", "study_id", "image_name", "prediction",
+    "confidence", "confidence_level", "probabilities",
+]
+
+
+def _to_record(row):
+    record = dict(zip(COLUMNS, row))
+    if record["probabilities"]:
+        record["probabilities"] = json.loads(record["probabilities"])
+    return record
+
+
+class HistoryStore:
+    """
+    Append-only prediction history in a SQLite database
+
+    Each thread gets its own connection (Streamlit runs every session on
+    its own script thread); WAL mode lets readers run while a write is in
+    progress.
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(_TABLE)
+        # Databases created before sessions were recorded
+        if "session_id" not in {row[1] for row in conn.execute("PRAGMA table_info(predictions)")}:
+            conn.execute("ALTER TABLE predictions ADD COLUMN session_id TEXT")
+        conn.executescript(_INDEXES)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ===============================
+    # WRITES
+    # ===============================
+    def append(self, record):
+        """
+        Append one prediction record (see `generate_pdf_report` for keys,
+        plus the `session_id` of the session that made it)
+        """
+        self.extend([record])
+
+    def extend(self, records):
+        """Append several records in one transaction"""
+        rows = [
+            (
+                r.get("session_id"), r["timestamp"], r.get("study_id"), r.get("image_name"), r["prediction"],
+                float(r["confidence"]), r["confidence_level"],
+                json.dumps(r["probabilities"]) if r.get("probabilities") else None,
+            )
+            for r in records
+        ]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO predictions (session_id, {', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                rows,
+            )
+
+    # ===============================
+    # READS
+    # ===============================
+    @staticmethod
+    def _where(session_id=None, prediction=None, confidence_level=None, study_id=None):
+        clauses, params = [], []
+        for column, value in (
+            ("session_id", session_id),
+            ("prediction", prediction),
+            ("confidence_level", confidence_level),
+            ("study_id", study_id),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def is_empty(self, **filters):
+        """True if no matching prediction has been recorded yet"""
+        where, params = self._where(**filters)
+        return self._connect().execute(
+            f"SELECT 1 FROM predictions{where} LIMIT 1", params
+        ).fetchone() is None
+
+    def page(self, before=None, page_size=50, **filters):
+        """
+        One page of records, newest first
+
+        Seeks past `before` on the (timestamp, id) index instead of counting
+        and skipping the newer rows, so every page is as cheap as the first.
+
+        Args:
+            before (tuple | None): Cursor returned with the previous page,
+                or None for the newest records
+            page_size (int): Records per page
+            **filters: session_id, prediction, confidence_level and/or study_id
+
+        Returns:
+            tuple[list[dict], tuple | None]: records, and the cursor of the
+            next (older) page or None if this is the last one
+        """
+        where, params = self._where(**filters)
+        if before is not None:
+            where += (" AND " if where else " WHERE ") + "(timestamp, id) < (?, ?)"
+            params += list(before)
+        rows = self._connect().execute(
+            f"SELECT id, {', '.join(COLUMNS)} FROM predictions{where} "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            params + [page_size + 1],
+        ).fetchall()
+        records = [_to_record(row[1:]) for row in rows[:page_size]]
+        cursor = None
+        if len(rows) > page_size:
+            last = rows[page_size - 1]
+            cursor = (last[1], last[0])
+        return records, cursor
+
+    def iter_records(self, **filters):
+        """Yield every matching record, oldest first, without loading them all"""
+        where, params = self._where(**filters)
+        cursor = self._connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM predictions{where} ORDER BY timestamp, id",
+            params,
+        )
+        for row in cursor:
+            yield _to_record(row)
+
+    def distinct(self, column, **filters):
+        """Distinct values of an indexed column (prediction, confidence_level, study_id)"""
+        if column not in ("prediction", "confidence_level", "study_id"):
+            raise ValueError(f"Not an indexed column: {column}")
+        where, params = self._where(**filters)
+        where += (" AND " if where else " WHERE ") + f"{column} IS NOT NULL"
+        rows = self._connect().execute(
+            f"SELECT DISTINCT {column} FROM predictions{where} ORDER BY {column}", params
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+@functools.lru_cache(maxsize=None)
+def get_history_store(path=HISTORY_DB_PATH):
+    """Process-wide history store"""
+    return HistoryStore(path)
@@ -1,35 +1,79 @@
 """
 PDF report generation for AI predictions
 """
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+import copy
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import Image as ReportImage
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.pagesizes import A4
-from io import BytesIO
+from reportlab.lib import colors
+
+from backend import tracing
+
+# Reports render off the Streamlit script thread
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-report")
+
+GRADCAM_WIDTH = 220
+
+
+@functools.lru_cache(maxsize=None)
+def _get_styles():
+    """Sample style sheet, built once per process"""
+    return getSampleStyleSheet()
+
+
+@functools.lru_cache(maxsize=None)
+def _static_elements():
+    """Title, disclaimer and table styles shared by every report"""
+    styles = _get_styles()
+
+    title = Paragraph("<b>AI Disease Prediction Report</b>", styles["Title"])
+    disclaimer = Paragraph(
+        "Disclaimer: This report is generated by an AI-based decision support system "
+        "and must be reviewed by a qualified medical professional.",
+        styles["Normal"],
+    )
+    probability_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#7b2ff7")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+    ])
+    return title, disclaimer, probability_style
+
+
+def _gradcam_flowable(gradcam_image):
+    buffer = BytesIO()
+    with tracing.span("pdf_image_encode"):
+        gradcam_image.convert("RGB").save(buffer, format="PNG")
+    buffer.seek(0)
+
+    width, height = gradcam_image.size
+    return ReportImage(
+        buffer,
+        width=GRADCAM_WIDTH,
+        height=GRADCAM_WIDTH * height / width,
+    )
 
 
-def generate_pdf_report(record):
+def report_flowables(record, probabilities=None, gradcam_image=None):
     """
-    Generate a professional PDF medical AI report
-    
-    Args:
-        record (dict): Prediction record with keys:
-            - timestamp: datetime string
-            - prediction: predicted class name
-            - confidence: confidence value (0-1)
-            - confidence_level: "High", "Moderate", "Low"
-            
+    Flowables of one prediction report, so several reports can share a document
+
     Returns:
-        BytesIO: PDF buffer ready for download
+        list: reportlab flowables
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
+    title, disclaimer, probability_style = _static_elements()
+    styles = _get_styles()
+
     content = []
 
-    # Title
-    content.append(
-        Paragraph("<b>AI Disease Prediction Report</b>", styles["Title"])
-    )
+    # Title (shallow copies: layout state is per document)
+    content.append(copy.copy(title))
     content.append(Spacer(1, 12))
 
     # Prediction details table
@@ -39,21 +83,70 @@ def generate_pdf_report(record):
         ["Confidence", f"{record['confidence']:.2%}"],
         ["Confidence Level", record["confidence_level"]],
     ]
+    if record.get("image_name"):
+        table_data.insert(1, ["Image", record["image_name"]])
 
     table = Table(table_data, colWidths=[150, 300])
     content.append(table)
     content.append(Spacer(1, 12))
 
-    # Disclaimer
-    content.append(
-        Paragraph(
-            "Disclaimer: This report is generated by an AI-based decision support system "
-            "and must be reviewed by a qualified medical professional.",
-            styles["Normal"],
+    # Class probabilities
+    if probabilities:
+        content.append(Paragraph("<b>Class Probabilities</b>", styles["Heading3"]))
+        prob_table = Table(
+            [["Disease Class", "Probability"]] + [
+                [name, f"{prob:.2%}"] for name, prob in probabilities.items()
+            ],
+            colWidths=[350, 100],
         )
-    )
+        prob_table.setStyle(probability_style)
+        content.append(prob_table)
+        content.append(Spacer(1, 12))
 
-    # Build PDF
-    doc.build(content)
-    buffer.seek(0)
-    return buffer
+    # Grad-CAM overlay
+    if gradcam_image is not None:
+        content.append(Paragraph("<b>Grad-CAM Explanation</b>", styles["Heading3"]))
+        content.append(_gradcam_flowable(gradcam_image))
+        content.append(Spacer(1, 12))
+
+    # Disclaimer
+    content.append(copy.copy(disclaimer))
+    return content
+
+
+def generate_pdf_report(record, probabilities=None, gradcam_image=None):
+    """
+    Generate a professional PDF medical AI report
+    
+    Args:
+        record (dict): Prediction record with keys:
+            - timestamp: datetime string
+            - prediction: predicted class name
+            - confidence: confidence value (0-1)
+            - confidence_level: "High", "Moderate", "Low"
+        probabilities (dict): Optional class name -> probability table
+        gradcam_image (PIL.Image): Optional Grad-CAM overlay to embed
+            
+    Returns:
+        BytesIO: PDF buffer ready for download
+    """
+    with tracing.request("generate_pdf_report"):
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        content = report_flowables(record, probabilities, gradcam_image)
+
+        # Build PDF
+        with tracing.span("pdf_build"):
+            doc.build(content)
+        buffer.seek(0)
+        return buffer
+
+
+def submit_pdf_report(record, probabilities=None, gradcam_image=None):
+    """
+    Render a report on the background pool
+
+    Returns:
+        concurrent.futures.Future: Resolves to the PDF BytesIO
+    """
+    return _executor.submit(generate_pdf_report, record, probabilities, gradcam_image)